@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.models import Attendance
+
+TIME_FIELDS = ('check_in_time', 'check_out_time', 'break_in_time', 'break_out_time')
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Attendance.worked_minutes and break_minutes from the check-in, "
+        "check-out and break times, for rows written without Attendance.save() "
+        "(raw SQL, imports, queryset.update())."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help="Only this project's attendance")
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError("--batch-size must be positive")
+
+        queryset = Attendance.objects.only('attendance_id', *TIME_FIELDS, *Attendance.DURATION_FIELDS).order_by()
+        if options['project'] is not None:
+            queryset = queryset.filter(project_id=options['project'])
+
+        started = time.perf_counter()
+        scanned = updated = 0
+        stale = []
+        for attendance in queryset.iterator(chunk_size=batch_size):
+            scanned += 1
+            stored = (attendance.worked_minutes, attendance.break_minutes)
+            attendance.set_durations()
+            if (attendance.worked_minutes, attendance.break_minutes) != stored:
+                stale.append(attendance)
+            if len(stale) >= batch_size:
+                updated += self.flush(stale)
+                stale = []
+        updated += self.flush(stale)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} attendance rows, updated {updated} in {elapsed:.2f}s"
+        ))
+
+    def flush(self, stale):
+        if not stale:
+            return 0
+        with transaction.atomic():
+            Attendance.objects.bulk_update(stale, Attendance.DURATION_FIELDS)
+        return len(stale)
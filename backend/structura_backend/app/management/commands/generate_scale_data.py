@@ -0,0 +1,189 @@
+import datetime
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app import models
+from app.management.commands.rebuild_progress_counters import rebuild_progress_counters
+
+EMAIL_DOMAIN = 'scale.structura.test'
+PASSWORD = 'benchmark123'
+
+FIRST_NAMES = ['Juan', 'Maria', 'Jose', 'Ana', 'Pedro', 'Rosa', 'Carlo', 'Liza', 'Mark', 'Joy']
+LAST_NAMES = ['Santos', 'Reyes', 'Cruz', 'Bautista', 'Garcia', 'Mendoza', 'Torres', 'Ramos']
+SUBTASK_TITLES = [
+    'Site survey', 'Permits', 'Excavation', 'Formworks', 'Rebar installation',
+    'Concrete pouring', 'Masonry', 'Electrical rough-in', 'Plumbing', 'Painting',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic project managers, projects (7 phases each), subtasks, "
+        f"field workers, assignments and daily attendance with bulk inserts. Accounts use "
+        f"@{EMAIL_DOMAIN} emails and the password '{PASSWORD}'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--managers', type=int, default=5)
+        parser.add_argument('--projects-per-manager', type=int, default=4)
+        parser.add_argument('--subtasks-per-phase', type=int, default=6)
+        parser.add_argument('--workers-per-project', type=int, default=25)
+        parser.add_argument('--workers-per-subtask', type=int, default=3)
+        parser.add_argument('--days', type=int, default=365, help="Days of attendance history")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--clear', action='store_true', help="Delete previously generated data first")
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        if options['clear']:
+            deleted, _ = models.User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+            models.Identity.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+            self.stdout.write(f"Deleted {deleted} previously generated rows")
+
+        with transaction.atomic():
+            counts = self.generate(options)
+
+        elapsed = time.perf_counter() - started
+        summary = ', '.join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Generated {summary} in {elapsed:.1f}s"))
+
+    def generate(self, options):
+        password_hash = make_password(PASSWORD)
+        run_id = models.User.objects.order_by('-user_id').values_list('user_id', flat=True).first() or 0
+        today = datetime.date.today()
+        start_date = today - datetime.timedelta(days=options['days'])
+
+        managers = self.bulk(models.User, [
+            models.User(
+                email=f'pm{run_id + index}@{EMAIL_DOMAIN}',
+                password_hash=password_hash,
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                role='ProjectManager',
+            )
+            for index in range(options['managers'])
+        ])
+        self.bulk(models.Identity, [
+            models.Identity(
+                email=manager.email,
+                principal_type='user',
+                principal_id=manager.user_id,
+                precedence=models.Identity.PRECEDENCE['user'],
+                password_hash=manager.password_hash,
+                login_payload=manager.login_payload(),
+            )
+            for manager in managers
+        ])
+
+        projects = self.bulk(models.Project, [
+            models.Project(
+                project_name=f'{self.random.choice(LAST_NAMES)} Residence {index + 1}',
+                user=manager,
+                project_type=self.random.choice(['Residential', 'Commercial', 'Industrial']),
+                start_date=start_date,
+                duration_days=options['days'] + 90,
+                budget=self.random.randrange(500_000, 50_000_000),
+                status='In Progress',
+            )
+            for manager in managers
+            for index in range(options['projects_per_manager'])
+        ])
+
+        phases = self.bulk(models.Phase, [
+            models.Phase(
+                project=project,
+                phase_name=phase_name,
+                days_duration=self.random.randrange(14, 120),
+                status=self.random.choice(['not_started', 'in_progress', 'completed']),
+            )
+            for project in projects
+            for phase_name, _ in models.Phase.PHASE_CHOICES
+        ])
+
+        subtasks = self.bulk(models.Subtask, [
+            models.Subtask(
+                phase=phase,
+                title=self.random.choice(SUBTASK_TITLES),
+                status=self.random.choice(['pending', 'in_progress', 'completed']),
+            )
+            for phase in phases
+            for _ in range(options['subtasks_per_phase'])
+        ])
+
+        workers = self.bulk(models.FieldWorker, [
+            models.FieldWorker(
+                project_id=project,
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                phone_number=f'0917{self.random.randrange(10**7):07d}',
+                role=self.random.choice(['Mason', 'Painter', 'Electrician', 'Carpenter']),
+                payrate=self.random.choice([550, 600, 650, 700, 800]),
+            )
+            for project in projects
+            for _ in range(options['workers_per_project'])
+        ])
+        workers_by_project = {}
+        for worker in workers:
+            workers_by_project.setdefault(worker.project_id_id, []).append(worker)
+
+        assignments = []
+        for subtask in subtasks:
+            crew = workers_by_project.get(subtask.phase.project_id, [])
+            for worker in self.random.sample(crew, min(options['workers_per_subtask'], len(crew))):
+                assignments.append(models.SubtaskFieldWorker(subtask=subtask, field_worker=worker))
+        self.bulk(models.SubtaskFieldWorker, assignments)
+
+        attendance_count = 0
+        for offset in range(options['days']):
+            day = start_date + datetime.timedelta(days=offset)
+            if day.weekday() == 6:
+                continue
+            rows = [self.attendance(worker, day) for worker in workers]
+            attendance_count += len(self.bulk(models.Attendance, rows, report=False))
+        self.stdout.write(f"  Attendance: {attendance_count}")
+
+        # Phases and subtasks were bulk-created, which skips the counter upkeep
+        rebuild_progress_counters([project.project_id for project in projects])
+
+        return {
+            'managers': len(managers),
+            'projects': len(projects),
+            'phases': len(phases),
+            'subtasks': len(subtasks),
+            'field workers': len(workers),
+            'assignments': len(assignments),
+            'attendance rows': attendance_count,
+        }
+
+    def attendance(self, worker, day):
+        if self.random.random() < 0.08:
+            return models.Attendance(
+                field_worker=worker, project_id=worker.project_id_id, attendance_date=day, status='absent'
+            )
+        check_in = datetime.time(7, self.random.randrange(0, 45))
+        attendance = models.Attendance(
+            field_worker=worker,
+            project_id=worker.project_id_id,
+            attendance_date=day,
+            check_in_time=check_in,
+            break_in_time=datetime.time(12, 0),
+            break_out_time=datetime.time(13, 0),
+            check_out_time=datetime.time(16, self.random.randrange(0, 60)),
+            status='on_site',
+        )
+        attendance.set_durations()
+        return attendance
+
+    def bulk(self, model, objects, report=True):
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        if report:
+            self.stdout.write(f"  {model.__name__}: {len(created)}")
+        return created
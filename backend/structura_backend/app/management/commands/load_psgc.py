@@ -0,0 +1,163 @@
+import csv
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.models import Barangay, City, Province, Region
+
+# (level, model, parent FK attribute), top of the hierarchy first
+LEVELS = [
+    ('region', Region, None),
+    ('province', Province, 'region_id'),
+    ('city', City, 'province_id'),
+    ('barangay', Barangay, 'city_id'),
+]
+
+LEVEL_ALIASES = {
+    'region': 'region', 'reg': 'region', 'regions': 'region',
+    'province': 'province', 'prov': 'province', 'provinces': 'province',
+    'city': 'city', 'mun': 'city', 'submun': 'city', 'municipality': 'city', 'cities': 'city',
+    'barangay': 'barangay', 'bgy': 'barangay', 'barangays': 'barangay',
+}
+
+# Parent code keys used by the PH_DATA dictionaries in load_ph_data.py
+PARENT_KEYS = ('parent_code', 'region_code', 'province_code', 'city_code')
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-upsert Philippine Region/Province/City/Barangay rows from a local "
+        "PSGC CSV, JSON Lines or JSON file. CSV columns: level, code, name, parent_code. "
+        "JSON Lines: one such object per line. JSON: a list of such objects, or the "
+        "PH_DATA layout used by load_ph_data.py. CSV and JSON Lines are streamed; "
+        "only --batch-size rows per level are held in memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="PSGC .csv, .jsonl or .json file")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--format', choices=['csv', 'jsonl', 'json'], help="Defaults to the file extension")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+        self.batch_size = options['batch_size']
+        if self.batch_size <= 0:
+            raise CommandError("--batch-size must be positive")
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+
+        started = time.perf_counter()
+        self.pending = {level: [] for level, *_ in LEVELS}
+        # Rows read before their parent was loaded; retried once everything else is in
+        self.deferred = {level: [] for level, *_ in LEVELS}
+        self.upserted = {level: 0 for level, *_ in LEVELS}
+        read = skipped = 0
+        for row in self.read_rows(path, file_format):
+            level = LEVEL_ALIASES.get(str(row.get('level', '')).strip().lower())
+            code = str(row.get('code') or '').strip()
+            name = str(row.get('name') or '').strip()
+            if level is None or not code or not name:
+                skipped += 1
+                continue
+            read += 1
+            parent_code = next((row[key] for key in PARENT_KEYS if row.get(key)), None)
+            self.pending[level].append((code, name, str(parent_code).strip() if parent_code else None))
+            if len(self.pending[level]) >= self.batch_size:
+                self.flush(level)
+        self.stdout.write(f"Read {read} rows ({skipped} skipped) from {path}")
+
+        for level, *_ in LEVELS:
+            self.flush(level)
+        orphans = {}
+        for level, *_ in LEVELS:
+            rows, self.deferred[level] = self.deferred[level], []
+            for start in range(0, len(rows), self.batch_size):
+                self.upsert(level, rows[start:start + self.batch_size])
+            orphans[level] = len(self.deferred[level])
+
+        for level, model, _ in LEVELS:
+            self.stdout.write(
+                f"  {model.__name__}: {self.upserted[level]} upserted, {orphans[level]} without a known parent"
+            )
+
+        # bulk_create does not send signals, so drop the cached address tree here
+        from rest_api import address_bundle
+        address_bundle.invalidate()
+
+        total = sum(self.upserted.values())
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {total} rows in {elapsed:.2f}s ({self.rate(total, elapsed)})"
+        ))
+
+    def flush(self, level):
+        """Upsert the buffered rows of `level`, flushing its ancestors first so parents exist."""
+        index = [name for name, *_ in LEVELS].index(level)
+        for ancestor, *_ in LEVELS[:index]:
+            if self.pending[ancestor]:
+                self.flush(ancestor)
+        rows, self.pending[level] = self.pending[level], []
+        if rows:
+            self.upsert(level, rows)
+
+    def upsert(self, level, rows):
+        index = [name for name, *_ in LEVELS].index(level)
+        _, model, parent_attr = LEVELS[index]
+        fields = [{'code': code, 'name': name} for code, name, _ in rows]
+        if parent_attr:
+            parent_model = LEVELS[index - 1][1]
+            parent_ids = dict(
+                parent_model.objects.filter(code__in={parent for *_, parent in rows if parent})
+                .values_list('code', 'id')
+            )
+            resolved = []
+            for row, values in zip(rows, fields):
+                parent_id = parent_ids.get(row[2])
+                if parent_id is None:
+                    self.deferred[level].append(row)
+                    continue
+                values[parent_attr] = parent_id
+                resolved.append(values)
+            fields = resolved
+        if not fields:
+            return
+
+        update_fields = ['name'] + ([parent_attr.removesuffix('_id')] if parent_attr else [])
+        with transaction.atomic():
+            model.objects.bulk_create(
+                [model(**values) for values in fields],
+                update_conflicts=True,
+                unique_fields=['code'],
+                update_fields=update_fields,
+            )
+        self.upserted[level] += len(fields)
+
+    def read_rows(self, path, file_format):
+        if file_format == 'csv':
+            with path.open(newline='', encoding='utf-8-sig') as handle:
+                yield from csv.DictReader(handle)
+        elif file_format == 'jsonl':
+            with path.open(encoding='utf-8') as handle:
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)
+        elif file_format == 'json':
+            # A JSON document has to be parsed whole; use CSV or JSON Lines for
+            # very large inputs
+            with path.open(encoding='utf-8') as handle:
+                data = json.load(handle)
+            if isinstance(data, dict):
+                for key, rows in data.items():
+                    for row in rows:
+                        yield {'level': key, **row}
+            else:
+                yield from data
+        else:
+            raise CommandError(f"Unsupported format {file_format!r}; use csv, jsonl or json")
+
+    def rate(self, count, elapsed):
+        return f"{count / elapsed:,.0f} rows/s" if elapsed > 0 else "n/a"
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.models import Client, Identity, Supervisors, User
+
+
+class Command(BaseCommand):
+    help = "Rebuild the login identity directory from User, Supervisors and Client."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            Identity.objects.all().delete()
+            count = 0
+            for model in (User, Supervisors, Client):
+                for principal in model.objects.iterator():
+                    Identity.sync(principal)
+                    count += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} identities"))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from app.models import Phase, Project, Subtask
+
+
+def count_of(queryset, group_by):
+    """Correlated COUNT(*) subquery for use in an UPDATE, 0 when there are no rows."""
+    counted = queryset.order_by().values(group_by).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def rebuild_progress_counters(project_ids=None):
+    phases = Phase.objects.all()
+    projects = Project.objects.all()
+    if project_ids is not None:
+        phases = phases.filter(project_id__in=project_ids)
+        projects = projects.filter(pk__in=project_ids)
+
+    subtasks = Subtask.objects.filter(phase=OuterRef('pk'))
+    phases.update(
+        total_subtasks=count_of(subtasks, 'phase'),
+        completed_subtasks=count_of(subtasks.filter(status='completed'), 'phase'),
+    )
+
+    project_phases = Phase.objects.filter(project=OuterRef('pk'))
+    subtask_totals = project_phases.order_by().values('project').annotate(
+        total=Sum('total_subtasks'), completed=Sum('completed_subtasks'),
+    )
+    projects.update(
+        total_phases=count_of(project_phases, 'project'),
+        completed_phases=count_of(project_phases.filter(status='completed'), 'project'),
+        total_subtasks=Coalesce(Subquery(subtask_totals.values('total'), output_field=IntegerField()), 0),
+        completed_subtasks=Coalesce(Subquery(subtask_totals.values('completed'), output_field=IntegerField()), 0),
+    )
+    return phases.count(), projects.count()
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the Phase and Project progress counters from the Subtask and Phase "
+        "tables, e.g. after raw SQL, fixtures or queryset.update() changed statuses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, action='append', help="Only these projects (repeatable)")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            phase_count, project_count = rebuild_progress_counters(options['project'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt progress counters for {phase_count} phases and {project_count} projects"
+        ))
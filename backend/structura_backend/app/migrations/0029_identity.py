@@ -0,0 +1,93 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+
+def backfill_identities(apps, schema_editor):
+    Identity = apps.get_model('app', 'Identity')
+    User = apps.get_model('app', 'User')
+    Supervisors = apps.get_model('app', 'Supervisors')
+    Client = apps.get_model('app', 'Client')
+
+    identities = []
+    for user in User.objects.all():
+        identities.append(Identity(
+            email=user.email,
+            principal_type='user',
+            principal_id=user.user_id,
+            precedence=0,
+            password_hash=user.password_hash,
+            login_payload={
+                'user_id': user.user_id,
+                'email': user.email,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'role': user.role,
+                'type': 'user',
+            },
+        ))
+    for supervisor in Supervisors.objects.all():
+        identities.append(Identity(
+            email=supervisor.email,
+            principal_type='Supervisor',
+            principal_id=supervisor.supervisor_id,
+            precedence=1,
+            password_hash=supervisor.password_hash,
+            login_payload={
+                'supervisor_id': supervisor.supervisor_id,
+                'user_id': supervisor.supervisor_id,
+                'project_id': supervisor.project_id_id,
+                'email': supervisor.email,
+                'first_name': supervisor.first_name,
+                'last_name': supervisor.last_name,
+                'role': 'Supervisor',
+                'type': 'Supervisor',
+            },
+        ))
+    for client in Client.objects.all():
+        identities.append(Identity(
+            email=client.email,
+            principal_type='Client',
+            principal_id=client.client_id,
+            precedence=2,
+            password_hash=client.password_hash,
+            login_payload={
+                'client_id': client.client_id,
+                'user_id': client.client_id,
+                'project_id': client.project_id_id,
+                'email': client.email,
+                'first_name': client.first_name,
+                'last_name': client.last_name,
+                'role': 'Client',
+                'type': 'Client',
+            },
+        ))
+    Identity.objects.bulk_create(identities, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0028_subtask_progress_notes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Identity',
+            fields=[
+                ('identity_id', models.AutoField(primary_key=True, serialize=False)),
+                ('email', models.EmailField(max_length=100)),
+                ('principal_type', models.CharField(choices=[('user', 'User'), ('Supervisor', 'Supervisor'), ('Client', 'Client')], max_length=20)),
+                ('principal_id', models.IntegerField()),
+                ('precedence', models.PositiveSmallIntegerField()),
+                ('password_hash', models.CharField(max_length=255)),
+                ('login_payload', models.JSONField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['email', 'precedence'], name='identity_email_lookup')],
+                'unique_together': {('principal_type', 'principal_id')},
+            },
+        ),
+        migrations.RunPython(backfill_identities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0029_identity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['project', 'attendance_date', 'attendance_id'], name='attendance_project_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fieldworker',
+            index=models.Index(fields=['project_id', 'fieldworker_id'], name='fieldworker_project_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='phase',
+            index=models.Index(fields=['project', 'created_at', 'phase_id'], name='phase_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['user', 'created_at', 'project_id'], name='project_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(fields=['phase', 'created_at', 'subtask_id'], name='subtask_phase_created_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0030_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollPeriod',
+            fields=[
+                ('payroll_period_id', models.AutoField(primary_key=True, serialize=False)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('total_worked_hours', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('total_gross_pay', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('finalized_at', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_periods', to='app.project')),
+            ],
+            options={
+                'ordering': ['-start_date'],
+                'unique_together': {('project', 'start_date', 'end_date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PayrollEntry',
+            fields=[
+                ('payroll_entry_id', models.AutoField(primary_key=True, serialize=False)),
+                ('worker_name', models.CharField(max_length=255)),
+                ('role', models.CharField(max_length=50)),
+                ('payrate', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('days_worked', models.PositiveIntegerField()),
+                ('worked_hours', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('regular_hours', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('overtime_hours', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('regular_pay', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('overtime_pay', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('gross_pay', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('field_worker', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payroll_entries', to='app.fieldworker')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='app.payrollperiod')),
+            ],
+            options={
+                'ordering': ['worker_name'],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+def minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+
+def backfill_minutes(apps, schema_editor):
+    Attendance = apps.get_model('app', 'Attendance')
+    batch = []
+    for attendance in Attendance.objects.exclude(check_in_time=None).exclude(check_out_time=None).iterator(chunk_size=2000):
+        rest = 0
+        if attendance.break_in_time is not None and attendance.break_out_time is not None:
+            rest = max(minute_of_day(attendance.break_out_time) - minute_of_day(attendance.break_in_time), 0)
+        shift = minute_of_day(attendance.check_out_time) - minute_of_day(attendance.check_in_time)
+        attendance.worked_minutes = max(shift - rest, 0)
+        attendance.break_minutes = rest
+        batch.append(attendance)
+        if len(batch) >= 2000:
+            Attendance.objects.bulk_update(batch, ['worked_minutes', 'break_minutes'])
+            batch = []
+    Attendance.objects.bulk_update(batch, ['worked_minutes', 'break_minutes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0031_payroll'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='break_minutes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='worked_minutes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_minutes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:36
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def count_of(queryset, group_by):
+    counted = queryset.order_by().values(group_by).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    Phase = apps.get_model('app', 'Phase')
+    Project = apps.get_model('app', 'Project')
+    Subtask = apps.get_model('app', 'Subtask')
+
+    subtasks = Subtask.objects.filter(phase=OuterRef('pk'))
+    Phase.objects.update(
+        total_subtasks=count_of(subtasks, 'phase'),
+        completed_subtasks=count_of(subtasks.filter(status='completed'), 'phase'),
+    )
+    phases = Phase.objects.filter(project=OuterRef('pk'))
+    subtask_totals = phases.order_by().values('project').annotate(
+        total=Sum('total_subtasks'), completed=Sum('completed_subtasks'),
+    )
+    Project.objects.update(
+        total_phases=count_of(phases, 'project'),
+        completed_phases=count_of(phases.filter(status='completed'), 'project'),
+        total_subtasks=Coalesce(Subquery(subtask_totals.values('total'), output_field=IntegerField()), 0),
+        completed_subtasks=Coalesce(Subquery(subtask_totals.values('completed'), output_field=IntegerField()), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0032_attendance_minutes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='phase',
+            name='completed_subtasks',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='phase',
+            name='total_subtasks',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='completed_phases',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='completed_subtasks',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='total_phases',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='total_subtasks',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0033_progress_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaAsset',
+            fields=[
+                ('media_id', models.AutoField(primary_key=True, serialize=False)),
+                ('key', models.CharField(max_length=32, unique=True)),
+                ('original_name', models.CharField(max_length=255)),
+                ('content_type', models.CharField(max_length=50)),
+                ('extension', models.CharField(max_length=10)),
+                ('size', models.PositiveIntegerField()),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('variants', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='media', to='app.project')),
+            ],
+        ),
+    ]
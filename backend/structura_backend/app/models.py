@@ -1,7 +1,35 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.contrib.auth.hashers import make_password
 
 
+def shift_counters(queryset, **deltas):
+    """Add the (possibly negative) deltas to counter columns in one UPDATE, never below zero."""
+    changes = {
+        field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items() if delta
+    }
+    if changes:
+        queryset.update(**changes)
+
+
+def keep_stored_counters(instance, counters, update_fields, tracked=()):
+    """
+    Lock the row and copy its counters onto `instance` before a full save, so
+    a stale in-memory copy does not overwrite increments made since it was
+    loaded. Returns the stored counters and `tracked` fields, or None for a
+    new row.
+    """
+    if instance.pk is None:
+        return None
+    stored = type(instance).objects.select_for_update().filter(pk=instance.pk).values(*tracked, *counters).first()
+    if stored is not None and update_fields is None:
+        for field in counters:
+            setattr(instance, field, stored[field])
+    return stored
+
+
 # Address Models (defined first so User can reference them)
 class Region(models.Model):
     code = models.CharField(max_length=20, unique=True)
@@ -90,6 +118,16 @@ class User(models.Model):
             self.password_hash = make_password(self.password_hash)
         super().save(*args, **kwargs)
 
+    def login_payload(self):
+        return {
+            'user_id': self.user_id,
+            'email': self.email,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'role': self.role,
+            'type': 'user',  # Indicate this is a regular user/project manager
+        }
+
     def __str__(self):
         return self.email
 
@@ -120,9 +158,32 @@ class Project(models.Model):
     status = models.CharField(max_length=50)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Progress roll-ups, maintained by Phase and Subtask writes
+    total_phases = models.PositiveIntegerField(default=0)
+    completed_phases = models.PositiveIntegerField(default=0)
+    total_subtasks = models.PositiveIntegerField(default=0)
+    completed_subtasks = models.PositiveIntegerField(default=0)
+
+    PROGRESS_FIELDS = ('total_phases', 'completed_phases', 'total_subtasks', 'completed_subtasks')
+
+    class Meta:
+        indexes = [
+            # projects/?user_id= ordered newest first
+            models.Index(fields=['user', 'created_at', 'project_id'], name='project_user_created_idx'),
+        ]
+
     def __str__(self):
         return self.project_name
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            keep_stored_counters(self, self.PROGRESS_FIELDS, kwargs.get('update_fields'))
+            super().save(*args, **kwargs)
+
+    @classmethod
+    def adjust_progress(cls, project_id, **deltas):
+        shift_counters(cls.objects.filter(pk=project_id), **deltas)
+
 
 # Supervisors Model
 class Supervisors(models.Model):
@@ -157,6 +218,18 @@ class Supervisors(models.Model):
             self.password_hash = make_password(self.password_hash)
         super().save(*args, **kwargs)
 
+    def login_payload(self):
+        return {
+            'supervisor_id': self.supervisor_id,
+            'user_id': self.supervisor_id,  # Use supervisor_id as user_id
+            'project_id': self.project_id_id,
+            'email': self.email,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'role': 'Supervisor',
+            'type': 'Supervisor',  # Indicate this is a supervisor
+        }
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} (Supervisor)"
 
@@ -187,6 +260,11 @@ class FieldWorker(models.Model):
     payrate = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project_id', 'fieldworker_id'], name='fieldworker_project_idx'),
+        ]
     
     def __str__(self):
         project_name = self.project_id.project_name if self.project_id else "Unassigned"
@@ -223,11 +301,85 @@ class Client(models.Model):
             self.password_hash = make_password(self.password_hash)
         super().save(*args, **kwargs)
 
+    def login_payload(self):
+        return {
+            'client_id': self.client_id,
+            'user_id': self.client_id,  # Use client_id as user_id
+            'project_id': self.project_id_id,
+            'email': self.email,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'role': 'Client',
+            'type': 'Client',  # Indicate this is a client
+        }
+
     def __str__(self):
         project_name = self.project_id.project_name if self.project_id else "Unassigned"
         return f"{self.first_name} {self.last_name} - {project_name}"
 
 
+# Identity Directory Model
+class Identity(models.Model):
+    """
+    Login directory spanning User, Supervisors and Client. One row per
+    account, kept in sync by app.signals, so login resolves any email with a
+    single indexed query. When the same email exists in several tables the
+    lowest precedence wins (User, then Supervisor, then Client).
+    """
+    PRINCIPAL_CHOICES = [
+        ('user', 'User'),
+        ('Supervisor', 'Supervisor'),
+        ('Client', 'Client'),
+    ]
+
+    PRECEDENCE = {
+        'user': 0,
+        'Supervisor': 1,
+        'Client': 2,
+    }
+
+    identity_id = models.AutoField(primary_key=True)
+    email = models.EmailField(max_length=100)
+    principal_type = models.CharField(max_length=20, choices=PRINCIPAL_CHOICES)
+    principal_id = models.IntegerField()
+    precedence = models.PositiveSmallIntegerField()
+    password_hash = models.CharField(max_length=255)
+    login_payload = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('principal_type', 'principal_id')
+        indexes = [
+            models.Index(fields=['email', 'precedence'], name='identity_email_lookup'),
+        ]
+
+    @classmethod
+    def sync(cls, principal):
+        """Create or refresh the directory row for a User, Supervisors or Client."""
+        payload = principal.login_payload()
+        principal_type = payload['type']
+        cls.objects.update_or_create(
+            principal_type=principal_type,
+            principal_id=principal.pk,
+            defaults={
+                'email': principal.email,
+                'precedence': cls.PRECEDENCE[principal_type],
+                'password_hash': principal.password_hash,
+                'login_payload': payload,
+            },
+        )
+
+    @classmethod
+    def remove(cls, principal):
+        cls.objects.filter(
+            principal_type=principal.login_payload()['type'],
+            principal_id=principal.pk,
+        ).delete()
+
+    def __str__(self):
+        return f"{self.email} ({self.principal_type})"
+
+
 # Phase Model
 class Phase(models.Model):
     PHASE_CHOICES = [
@@ -255,12 +407,81 @@ class Phase(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Maintained by Subtask writes; see Phase.adjust_subtask_counts. Queryset
+    # deletes bypass delete() below and must adjust the counters themselves.
+    total_subtasks = models.PositiveIntegerField(default=0)
+    completed_subtasks = models.PositiveIntegerField(default=0)
+
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['project', 'created_at', 'phase_id'], name='phase_project_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.phase_name} - {self.project.project_name}"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            stored = keep_stored_counters(
+                self, ('total_subtasks', 'completed_subtasks'), update_fields, tracked=('project_id', 'status')
+            )
+            super().save(*args, **kwargs)
+            if update_fields is None or {'project', 'project_id', 'status'} & set(update_fields):
+                self.count_change(stored)
+
+    def delete(self, *args, **kwargs):
+        # The cascade removes the subtasks without touching any counters;
+        # take the whole phase off its project in one UPDATE instead
+        with transaction.atomic():
+            stored = Phase.objects.select_for_update().filter(pk=self.pk).values(
+                'project_id', 'status', 'total_subtasks', 'completed_subtasks'
+            ).first()
+            result = super().delete(*args, **kwargs)
+            if stored is not None:
+                Project.adjust_progress(
+                    stored['project_id'],
+                    total_phases=-1,
+                    completed_phases=-int(stored['status'] == 'completed'),
+                    total_subtasks=-stored['total_subtasks'],
+                    completed_subtasks=-stored['completed_subtasks'],
+                )
+            return result
+
+    def count_change(self, stored):
+        """Move this phase's contribution to its project's counters from `stored` to its current state."""
+        completed = int(self.status == 'completed')
+        if stored is None:
+            Project.adjust_progress(self.project_id, total_phases=1, completed_phases=completed)
+            return
+        was_completed = int(stored['status'] == 'completed')
+        if stored['project_id'] == self.project_id:
+            Project.adjust_progress(self.project_id, completed_phases=completed - was_completed)
+            return
+        Project.adjust_progress(
+            stored['project_id'],
+            total_phases=-1,
+            completed_phases=-was_completed,
+            total_subtasks=-stored['total_subtasks'],
+            completed_subtasks=-stored['completed_subtasks'],
+        )
+        Project.adjust_progress(
+            self.project_id,
+            total_phases=1,
+            completed_phases=completed,
+            total_subtasks=stored['total_subtasks'],
+            completed_subtasks=stored['completed_subtasks'],
+        )
+
+    @classmethod
+    def adjust_subtask_counts(cls, phase_id, total=0, completed=0):
+        """Shift a phase's subtask counters and its project's roll-up together."""
+        if not (total or completed):
+            return
+        shift_counters(cls.objects.filter(pk=phase_id), total_subtasks=total, completed_subtasks=completed)
+        shift_counters(Project.objects.filter(phases=phase_id), total_subtasks=total, completed_subtasks=completed)
+
 
 # Subtask Model
 class Subtask(models.Model):
@@ -280,10 +501,46 @@ class Subtask(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['phase', 'created_at', 'subtask_id'], name='subtask_phase_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.phase.phase_name}"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            stored = None
+            if self.pk is not None:
+                stored = Subtask.objects.select_for_update().filter(pk=self.pk).values('phase_id', 'status').first()
+            super().save(*args, **kwargs)
+            if update_fields is None or {'phase', 'phase_id', 'status'} & set(update_fields):
+                self.count_change(stored)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            stored = Subtask.objects.select_for_update().filter(pk=self.pk).values('phase_id', 'status').first()
+            result = super().delete(*args, **kwargs)
+            if stored is not None:
+                Phase.adjust_subtask_counts(
+                    stored['phase_id'], total=-1, completed=-int(stored['status'] == 'completed')
+                )
+            return result
+
+    def count_change(self, stored):
+        """Move this subtask's contribution to the progress counters from `stored` to its current state."""
+        completed = int(self.status == 'completed')
+        if stored is None:
+            Phase.adjust_subtask_counts(self.phase_id, total=1, completed=completed)
+            return
+        was_completed = int(stored['status'] == 'completed')
+        if stored['phase_id'] == self.phase_id:
+            Phase.adjust_subtask_counts(self.phase_id, completed=completed - was_completed)
+        else:
+            Phase.adjust_subtask_counts(stored['phase_id'], total=-1, completed=-was_completed)
+            Phase.adjust_subtask_counts(self.phase_id, total=1, completed=completed)
+
 
 # SubtaskFieldWorker Assignment Model
 class SubtaskFieldWorker(models.Model):
@@ -320,13 +577,124 @@ class Attendance(models.Model):
     break_out_time = models.TimeField(null=True, blank=True)
     
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='absent')
+
+    # Derived from the four times above by set_durations(); stored so reports
+    # can SUM/AVG hours in SQL
+    worked_minutes = models.PositiveIntegerField(default=0)
+    break_minutes = models.PositiveIntegerField(default=0)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    DURATION_FIELDS = ('worked_minutes', 'break_minutes')
+
     class Meta:
         unique_together = ('field_worker', 'attendance_date')
         ordering = ['-attendance_date']
+        indexes = [
+            # attendance/?project_id=[&attendance_date=] ordered by date
+            models.Index(fields=['project', 'attendance_date', 'attendance_id'], name='attendance_project_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.field_worker.first_name} {self.field_worker.last_name} - {self.attendance_date}"
+
+    def save(self, *args, **kwargs):
+        self.set_durations()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *self.DURATION_FIELDS}
+        super().save(*args, **kwargs)
+
+    def set_durations(self):
+        """
+        Recompute worked_minutes and break_minutes. bulk_create/bulk_update skip
+        save(), so bulk writers call this on each object themselves.
+        """
+        self.worked_minutes, self.break_minutes = attendance_minutes(
+            self.check_in_time, self.check_out_time, self.break_in_time, self.break_out_time
+        )
+
+
+def _minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+
+def attendance_minutes(check_in, check_out, break_in, break_out):
+    """
+    (worked, break) minutes for one attendance row. A break only counts inside a
+    complete shift, and an unfinished or inverted interval counts as zero.
+    """
+    if check_in is None or check_out is None:
+        return 0, 0
+    shift = _minute_of_day(check_out) - _minute_of_day(check_in)
+    rest = 0
+    if break_in is not None and break_out is not None:
+        rest = max(_minute_of_day(break_out) - _minute_of_day(break_in), 0)
+    return max(shift - rest, 0), rest
+
+
+# Payroll Snapshot Models
+class PayrollPeriod(models.Model):
+    """A finalized pay period; its entries are stored so it is never recomputed."""
+    payroll_period_id = models.AutoField(primary_key=True)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='payroll_periods')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    total_worked_hours = models.DecimalField(max_digits=12, decimal_places=2)
+    total_gross_pay = models.DecimalField(max_digits=14, decimal_places=2)
+    finalized_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('project', 'start_date', 'end_date')
+        ordering = ['-start_date']
+
+    def __str__(self):
+        return f"{self.project.project_name} payroll {self.start_date} - {self.end_date}"
+
+
+class PayrollEntry(models.Model):
+    payroll_entry_id = models.AutoField(primary_key=True)
+    period = models.ForeignKey(PayrollPeriod, on_delete=models.CASCADE, related_name='entries')
+    field_worker = models.ForeignKey(FieldWorker, on_delete=models.SET_NULL, null=True, blank=True, related_name='payroll_entries')
+
+    # Copied at finalization so the snapshot survives later edits
+    worker_name = models.CharField(max_length=255)
+    role = models.CharField(max_length=50)
+    payrate = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    days_worked = models.PositiveIntegerField()
+    worked_hours = models.DecimalField(max_digits=10, decimal_places=2)
+    regular_hours = models.DecimalField(max_digits=10, decimal_places=2)
+    overtime_hours = models.DecimalField(max_digits=10, decimal_places=2)
+    regular_pay = models.DecimalField(max_digits=12, decimal_places=2)
+    overtime_pay = models.DecimalField(max_digits=12, decimal_places=2)
+    gross_pay = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        ordering = ['worker_name']
+
+    def __str__(self):
+        return f"{self.worker_name} - {self.gross_pay}"
+
+
+# Uploaded Media Model
+class MediaAsset(models.Model):
+    """An uploaded image; files live in the default storage under media/<key>/."""
+    media_id = models.AutoField(primary_key=True)
+    key = models.CharField(max_length=32, unique=True)
+    project = models.ForeignKey(Project, on_delete=models.SET_NULL, null=True, blank=True, related_name='media')
+
+    original_name = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=50)
+    extension = models.CharField(max_length=10)
+    size = models.PositiveIntegerField()
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    # Thumbnail variant names that were generated, e.g. ["small", "medium"]
+    variants = models.JSONField(default=list, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.key} ({self.original_name})"
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Client, Identity, Project, Supervisors, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Supervisors)
+@receiver(post_save, sender=Client)
+def sync_identity(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Identity.sync(instance)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Supervisors)
+@receiver(post_delete, sender=Client)
+def remove_identity(sender, instance, **kwargs):
+    Identity.remove(instance)
+
+
+@receiver(post_delete, sender=Project)
+def clear_identity_project(sender, instance, **kwargs):
+    # Supervisors and clients lose their project through SET_NULL, which
+    # does not send post_save, so refresh their cached login payloads here.
+    for model, principal_type in ((Supervisors, 'Supervisor'), (Client, 'Client')):
+        stale_ids = Identity.objects.filter(
+            principal_type=principal_type,
+            login_payload__project_id=instance.pk,
+        ).values('principal_id')
+        for principal in model.objects.filter(pk__in=stale_ids):
+            Identity.sync(principal)
+
@@ -0,0 +1,107 @@
+"""
+Prebuilt Region -> Province -> City -> Barangay documents.
+
+The hierarchy is rebuilt at most once per data version and kept in memory as
+JSON and gzip bytes together with a strong ETag. The version lives in Django's
+cache so every worker sharing that cache notices a change; any save or delete
+on the address models bumps it (see rest_api.signals), and bulk loaders call
+`invalidate()` directly.
+"""
+import gzip
+import hashlib
+import json
+import threading
+import uuid
+
+from django.core.cache import cache
+
+from app import models
+
+VERSION_CACHE_KEY = 'rest_api:address-bundle:version'
+
+_bundles = {}
+_lock = threading.Lock()
+
+
+class AddressBundle:
+    def __init__(self, document):
+        self.body = json.dumps(document, separators=(',', ':')).encode()
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+
+def get_version():
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(VERSION_CACHE_KEY, version, timeout=None):
+            version = cache.get(VERSION_CACHE_KEY, version)
+    return version
+
+
+def invalidate():
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def get_bundle(region_id=None):
+    """
+    Return the AddressBundle for the whole country or one region, or None if
+    the region does not exist.
+    """
+    version = get_version()
+    key = (version, region_id)
+    bundle = _bundles.get(key)
+    if bundle is not None:
+        return bundle
+
+    with _lock:
+        bundle = _bundles.get(key)
+        if bundle is None:
+            document = build_document(region_id)
+            if document is None:
+                return None
+            bundle = AddressBundle(document)
+            for stale in [k for k in _bundles if k[0] != version]:
+                del _bundles[stale]
+            _bundles[key] = bundle
+    return bundle
+
+
+def build_document(region_id=None):
+    """Assemble the nested hierarchy with one query per level."""
+    regions = models.Region.objects.order_by('name')
+    provinces = models.Province.objects.order_by('name')
+    cities = models.City.objects.order_by('name')
+    barangays = models.Barangay.objects.order_by('name')
+    if region_id is not None:
+        regions = regions.filter(pk=region_id)
+        provinces = provinces.filter(region_id=region_id)
+        cities = cities.filter(province__region_id=region_id)
+        barangays = barangays.filter(city__province__region_id=region_id)
+
+    region_list = [
+        {'id': pk, 'code': code, 'name': name, 'provinces': []}
+        for pk, code, name in regions.values_list('id', 'code', 'name')
+    ]
+    if region_id is not None and not region_list:
+        return None
+
+    region_map = {region['id']: region for region in region_list}
+    province_map = {}
+    for pk, code, name, parent_id in provinces.values_list('id', 'code', 'name', 'region_id'):
+        province = {'id': pk, 'code': code, 'name': name, 'cities': []}
+        province_map[pk] = province
+        region_map[parent_id]['provinces'].append(province)
+
+    city_map = {}
+    for pk, code, name, parent_id in cities.values_list('id', 'code', 'name', 'province_id'):
+        city = {'id': pk, 'code': code, 'name': name, 'barangays': []}
+        city_map[pk] = city
+        province_map[parent_id]['cities'].append(city)
+
+    for pk, code, name, parent_id in barangays.values_list('id', 'code', 'name', 'city_id'):
+        city_map[parent_id]['barangays'].append({'id': pk, 'code': code, 'name': name})
+
+    return {'regions': region_list}
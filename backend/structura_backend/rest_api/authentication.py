@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core import signing
+from rest_framework import authentication, exceptions, permissions
+
+TOKEN_SALT = 'rest_api.authentication.token'
+
+
+class TokenPrincipal:
+    """
+    The account a token was issued to. Built from the token payload alone,
+    so authenticated requests never read the credential tables.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, payload):
+        self.type = payload['type']
+        self.id = payload['id']
+        self.role = payload.get('role')
+        self.email = payload.get('email')
+        self.project_id = payload.get('project_id')
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __str__(self):
+        return f"{self.type}:{self.id}"
+
+
+class ExpiringLRUCache:
+    """Thread-safe LRU where every entry also carries its own expiry time."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = ExpiringLRUCache(getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 4096))
+
+
+def issue_token(principal_type, principal_id, role=None, email=None, project_id=None):
+    """Sign a token for a principal returned by login_user."""
+    max_age = getattr(settings, 'AUTH_TOKEN_MAX_AGE', 60 * 60 * 24 * 7)
+    return signing.dumps({
+        'type': principal_type,
+        'id': principal_id,
+        'role': role,
+        'email': email,
+        'project_id': project_id,
+        'exp': int(time.time()) + max_age,
+    }, salt=TOKEN_SALT, compress=True)
+
+
+def verify_token(token):
+    """
+    Return the TokenPrincipal for a token. Signature checks are cached per
+    token until it expires, so repeat requests cost a dictionary lookup.
+    """
+    principal = token_cache.get(token)
+    if principal is not None:
+        return principal
+
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT)
+    except signing.BadSignature:
+        raise exceptions.AuthenticationFailed('Invalid token')
+    if payload.get('exp', 0) <= time.time():
+        raise exceptions.AuthenticationFailed('Token has expired')
+
+    principal = TokenPrincipal(payload)
+    token_cache.set(token, principal, payload['exp'])
+    return principal
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Accepts `Authorization: Bearer <token>` (or `Token <token>`) headers
+    carrying a token issued by login_user. On views that allow anyone, a bad
+    or expired token leaves the request anonymous instead of failing it, so
+    a client holding a stale token can still reach them (and log in again).
+    """
+    keywords = (b'bearer', b'token')
+
+    def authenticate(self, request):
+        try:
+            return self._authenticate(request)
+        except exceptions.AuthenticationFailed:
+            if self._allows_anonymous(request):
+                return None
+            raise
+
+    def _authenticate(self, request):
+        header = authentication.get_authorization_header(request).split()
+        if not header or header[0].lower() not in self.keywords:
+            return None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header')
+        try:
+            token = header[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Invalid token header')
+        return (verify_token(token), token)
+
+    def _allows_anonymous(self, request):
+        view = getattr(request, 'parser_context', {}).get('view')
+        return view is not None and all(
+            isinstance(permission, permissions.AllowAny) for permission in view.get_permissions()
+        )
+
+    def authenticate_header(self, request):
+        return 'Bearer'
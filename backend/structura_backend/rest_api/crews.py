@@ -0,0 +1,44 @@
+"""
+Moving a crew of field workers between projects.
+
+The move is set-based: one UPDATE re-points the workers and one DELETE drops
+their subtask assignments on the project they left, in the same transaction.
+Attendance stays with the project it was recorded on.
+"""
+from django.db import transaction
+
+from app import models
+
+from . import response_cache
+
+
+def crew_queryset(from_project_id, field_worker_ids=None, role=None):
+    workers = models.FieldWorker.objects.filter(project_id=from_project_id)
+    if field_worker_ids:
+        workers = workers.filter(pk__in=field_worker_ids)
+    if role:
+        workers = workers.filter(role=role)
+    return workers
+
+
+@transaction.atomic
+def move_workers(workers, to_project_id):
+    """
+    Move the field workers in `workers` to `to_project_id` and remove their
+    assignments to subtasks of any other project. Returns the counts.
+    """
+    rows = list(workers.select_for_update().values_list('pk', 'project_id'))
+    if not rows:
+        return {'moved': 0, 'assignments_removed': 0}
+    worker_ids = [pk for pk, _ in rows]
+    from_project_ids = {project_id for _, project_id in rows}
+    assignments_removed, _ = models.SubtaskFieldWorker.objects.filter(
+        field_worker_id__in=worker_ids,
+    ).exclude(subtask__phase__project_id=to_project_id).delete()
+    moved = models.FieldWorker.objects.filter(pk__in=worker_ids).update(project_id=to_project_id)
+
+    # update() sends no signals
+    for project_id in from_project_ids | {to_project_id}:
+        transaction.on_commit(lambda project_id=project_id: response_cache.invalidate(project_id))
+
+    return {'moved': moved, 'assignments_removed': assignments_removed}
@@ -0,0 +1,105 @@
+"""
+Async dashboard endpoints.
+
+Django's async ORM methods (acount, aaggregate, ...) all hop onto one shared
+thread, so awaiting several of them together still runs the queries one after
+another. The dashboard reads are independent, so `gather_reads` runs each on
+its own worker thread and database connection instead, and the response
+takes about as long as the slowest query rather than the sum of them.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.db.models import Count
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from app import models
+
+from .middleware import count_request_queries
+
+
+def _isolated(read):
+    def run():
+        # Worker threads keep their own connections; apply the same
+        # CONN_MAX_AGE / health check handling Django does around requests.
+        close_old_connections()
+        try:
+            with count_request_queries():
+                return read()
+        finally:
+            close_old_connections()
+    return run
+
+
+async def gather_reads(**reads):
+    """Run independent read callables concurrently and return their results by name."""
+    results = await asyncio.gather(*(
+        sync_to_async(_isolated(read), thread_sensitive=False)()
+        for read in reads.values()
+    ))
+    return dict(zip(reads, results))
+
+
+def _counts(queryset, field):
+    return {row[field]: row['count'] for row in queryset.values(field).annotate(count=Count('pk')).order_by()}
+
+
+@require_GET
+async def manager_dashboard(request):
+    """
+    Project manager dashboard: project counts, today's attendance, phases in
+    progress and worker headcount across every project of ?user_id=.
+    """
+    user_id = request.GET.get('user_id')
+    if not user_id or not user_id.isdigit():
+        return JsonResponse({'success': False, 'message': 'user_id is required'}, status=400)
+    today = timezone.localdate()
+
+    data = await gather_reads(
+        projects_by_status=lambda: _counts(models.Project.objects.filter(user_id=user_id), 'status'),
+        attendance_today=lambda: _counts(
+            models.Attendance.objects.filter(project__user_id=user_id, attendance_date=today), 'status'
+        ),
+        phases_in_progress=lambda: list(
+            models.Phase.objects.filter(project__user_id=user_id, status='in_progress')
+            .order_by('project_id', 'created_at')
+            .values('phase_id', 'phase_name', 'project_id', 'project__project_name')
+        ),
+        workers_by_role=lambda: _counts(models.FieldWorker.objects.filter(project_id__user_id=user_id), 'role'),
+    )
+    return JsonResponse({
+        'date': today,
+        'total_projects': sum(data['projects_by_status'].values()),
+        'total_field_workers': sum(data['workers_by_role'].values()),
+        **data,
+    })
+
+
+@require_GET
+async def project_dashboard(request, project_id):
+    """
+    Supervisor dashboard for one project: today's attendance, headcount by
+    role, and phase and subtask progress.
+    """
+    today = timezone.localdate()
+    data = await gather_reads(
+        project=lambda: models.Project.objects.filter(pk=project_id).values(
+            'project_id', 'project_name', 'status', 'start_date', 'end_date'
+        ).first(),
+        attendance_today=lambda: _counts(
+            models.Attendance.objects.filter(project_id=project_id, attendance_date=today), 'status'
+        ),
+        workers_by_role=lambda: _counts(models.FieldWorker.objects.filter(project_id=project_id), 'role'),
+        phases_by_status=lambda: _counts(models.Phase.objects.filter(project_id=project_id), 'status'),
+        subtasks_by_status=lambda: _counts(models.Subtask.objects.filter(phase__project_id=project_id), 'status'),
+    )
+    if data['project'] is None:
+        return JsonResponse({'success': False, 'message': 'Project not found'}, status=404)
+    return JsonResponse({
+        'date': today,
+        'total_field_workers': sum(data['workers_by_role'].values()),
+        **data,
+    })
@@ -0,0 +1,74 @@
+"""
+Streaming CSV exports.
+
+Rows are read with QuerySet.iterator(), which on PostgreSQL reads through a
+server-side cursor CHUNK_SIZE rows at a time, and each chunk is written to the
+response as soon as it is formatted. Memory use stays flat whether the export
+is a hundred rows or a million.
+"""
+import csv
+
+from django.http import StreamingHttpResponse
+
+CHUNK_SIZE = 2000
+
+# (CSV header, queryset lookup)
+ATTENDANCE_COLUMNS = [
+    ('attendance_id', 'attendance_id'),
+    ('attendance_date', 'attendance_date'),
+    ('field_worker_id', 'field_worker_id'),
+    ('first_name', 'field_worker__first_name'),
+    ('last_name', 'field_worker__last_name'),
+    ('role', 'field_worker__role'),
+    ('status', 'status'),
+    ('check_in_time', 'check_in_time'),
+    ('break_in_time', 'break_in_time'),
+    ('break_out_time', 'break_out_time'),
+    ('check_out_time', 'check_out_time'),
+    ('worked_minutes', 'worked_minutes'),
+    ('break_minutes', 'break_minutes'),
+]
+
+FIELD_WORKER_COLUMNS = [
+    ('fieldworker_id', 'fieldworker_id'),
+    ('first_name', 'first_name'),
+    ('middle_name', 'middle_name'),
+    ('last_name', 'last_name'),
+    ('role', 'role'),
+    ('phone_number', 'phone_number'),
+    ('birthdate', 'birthdate'),
+    ('sss_id', 'sss_id'),
+    ('philhealth_id', 'philhealth_id'),
+    ('pagibig_id', 'pagibig_id'),
+    ('payrate', 'payrate'),
+    ('created_at', 'created_at'),
+]
+
+
+class Echo:
+    """Write target for csv.writer that hands each formatted line back."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(columns, queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow([header for header, _ in columns])
+
+    chunk = []
+    rows = queryset.values_list(*(lookup for _, lookup in columns)).iterator(chunk_size=CHUNK_SIZE)
+    for row in rows:
+        chunk.append(writer.writerow(['' if value is None else value for value in row]))
+        if len(chunk) >= CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def csv_response(filename, columns, queryset):
+    response = StreamingHttpResponse(csv_lines(columns, queryset), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'no-store'
+    return response
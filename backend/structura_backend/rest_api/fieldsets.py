@@ -0,0 +1,148 @@
+"""
+Sparse fieldsets.
+
+GET requests can ask for part of a resource with ?fields=a,b or drop fields
+with ?omit=c,d. SparseFieldsetMixin removes the other fields from the
+top-level serializer (nested serializers are returned whole) and
+SparseQuerysetMixin shapes the view's queryset to match: only() the columns
+the remaining fields read, select_related() the foreign keys they follow and
+prefetch_related() only the relations they need.
+
+Model fields and dotted sources through foreign keys (source='region.name')
+are resolved from the model. Fields the model cannot explain, such as
+SerializerMethodFields and nested serializers, list what they read in
+Meta.field_lookups as lookup paths or Prefetch objects; a field without one
+turns off only() so it still sees every column.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _names(value):
+    return [name.strip() for name in value.split(',') if name.strip()] if value else []
+
+
+def requested_fields(request):
+    """(fields, omit) from the query string; fields is None when not given."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+    params = getattr(request, 'query_params', request.GET)
+    fields = _names(params.get('fields'))
+    return (set(fields) if fields else None), set(_names(params.get('omit')))
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin honouring ?fields= and ?omit= on the top-level serializer."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_top_level():
+            return fields
+        only, omit = requested_fields(self.context.get('request'))
+        return {
+            name: field for name, field in fields.items()
+            if (only is None or name in only) and name not in omit
+        }
+
+    def _is_top_level(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+def _resolve(model, path):
+    """
+    Split a lookup path into (column path or None, select_related path or
+    None, prefetch path or None). Raises FieldDoesNotExist for paths that
+    are not model fields.
+    """
+    parts = path.split('__')
+    for index, part in enumerate(parts):
+        field = model._meta.get_field(part)
+        if field.many_to_many or field.one_to_many or (field.one_to_one and not field.concrete):
+            return None, None, path
+        if field.is_relation and index + 1 < len(parts):
+            model = field.related_model
+            continue
+        joins = '__'.join(parts[:index]) or None
+        return path, joins, None
+    return None, None, None
+
+
+def shape_queryset(queryset, fields, lookups=(), extra_columns=()):
+    """
+    Apply select_related/prefetch_related for the serializer `fields` and
+    only() the columns they read plus `extra_columns`.
+    """
+    lookups = dict(lookups)
+    model = queryset.model
+    columns = {model._meta.pk.name, *extra_columns}
+    joins = set()
+    prefetches = []
+    complete = True
+
+    for name, field in fields.items():
+        if field.write_only:
+            continue
+        if name in lookups:
+            paths = lookups[name]
+        elif field.source_attrs:
+            paths = ['__'.join(field.source_attrs)]
+        else:
+            complete = False
+            continue
+        for path in paths:
+            if isinstance(path, Prefetch):
+                prefetches.append(path)
+                continue
+            try:
+                column, join, prefetch = _resolve(model, path)
+            except FieldDoesNotExist:
+                complete = False
+                continue
+            if column:
+                columns.add(column)
+            if join:
+                joins.add(join)
+                # Keep the foreign key columns the join hangs off
+                parts = join.split('__')
+                columns.update('__'.join(parts[:end]) for end in range(1, len(parts) + 1))
+            if prefetch and prefetch not in prefetches:
+                prefetches.append(prefetch)
+
+    if joins:
+        queryset = queryset.select_related(*sorted(joins))
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    if complete:
+        queryset = queryset.only(*sorted(columns))
+    return queryset
+
+
+class SparseQuerysetMixin:
+    """
+    View mixin that loads what the (possibly sparse) serializer reads. Only
+    safe methods are shaped: updates and deletes serialize nothing from the
+    joins, and saving an instance with deferred fields would write just the
+    loaded ones.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        serializer = self.get_serializer()
+        meta = getattr(serializer, 'Meta', None)
+        ordering = [
+            name.lstrip('-') for name in getattr(self, 'pagination_ordering', ())
+            if name.lstrip('-') != 'pk'
+        ]
+        return shape_queryset(
+            queryset,
+            serializer.fields,
+            lookups=getattr(meta, 'field_lookups', {}),
+            extra_columns=ordering,
+        )
@@ -0,0 +1,109 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from app import models
+from rest_api import views
+
+# (label, viewset, query params; values are filled from the sample rows)
+HOT_ENDPOINTS = [
+    ('projects by user', views.ProjectViewSet, {'user_id': 'user_id'}),
+    ('attendance by project', views.AttendanceViewSet, {'project_id': 'project_id'}),
+    ('attendance by project and day', views.AttendanceViewSet,
+     {'project_id': 'project_id', 'attendance_date': 'attendance_date'}),
+    ('field workers by project', views.FieldWorkerViewSet, {'project_id': 'project_id'}),
+    ('phases by project', views.PhaseViewSet, {'project_id': 'project_id'}),
+    ('subtasks by phase', views.SubtaskViewSet, {'phase_id': 'phase_id'}),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the list query behind each hot rest_api endpoint and flag "
+        "sequential scans and sort steps. On PostgreSQL the planner is told to "
+        "avoid seq scans and sorts, so a flagged step means no index can serve "
+        "that filter and order regardless of table size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strict', action='store_true', help="Exit with an error if anything is flagged")
+        parser.add_argument('--verbose-plans', action='store_true', help="Print the full plan for every query")
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError(f"Query plan audit does not support {connection.vendor}")
+
+        sample = self.sample_values()
+        flagged = 0
+        for label, viewset, params in HOT_ENDPOINTS:
+            query_params = {name: sample[key] for name, key in params.items()}
+            for variant, queryset in self.endpoint_querysets(viewset, query_params):
+                plan, issues = self.explain(queryset)
+                status = self.style.ERROR('FLAGGED') if issues else self.style.SUCCESS('ok')
+                self.stdout.write(f"{status:<7} {label} [{variant}]")
+                for issue in issues:
+                    self.stdout.write(f"          - {issue}")
+                if options['verbose_plans']:
+                    self.stdout.write(plan)
+                flagged += bool(issues)
+
+        if flagged and options['strict']:
+            raise CommandError(f"{flagged} endpoint queries need an index")
+        self.stdout.write(f"{flagged} flagged")
+
+    def sample_values(self):
+        """
+        Use ids from existing rows so the plans use realistic parameters;
+        run generate_scale_data first to audit against a seeded dataset.
+        """
+        attendance = models.Attendance.objects.order_by('-attendance_date').first()
+        subtask = models.Subtask.objects.first()
+        project = models.Project.objects.exclude(user=None).first()
+        return {
+            'user_id': project.user_id if project else 1,
+            'project_id': attendance.project_id if attendance else (project.pk if project else 1),
+            'attendance_date': str(attendance.attendance_date) if attendance else '2025-01-01',
+            'phase_id': subtask.phase_id if subtask else 1,
+        }
+
+    def endpoint_querysets(self, viewset, query_params):
+        request = Request(APIRequestFactory().get('/', query_params))
+        view = viewset(request=request, format_kwarg=None, action='list', kwargs={})
+        queryset = view.filter_queryset(view.get_queryset())
+        yield 'full list', queryset
+        page_size = view.paginator.page_size if view.paginator else 50
+        yield 'first page', queryset.order_by(*view.pagination_ordering)[:page_size + 1]
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+                    cursor.execute('SET LOCAL enable_sort = off')
+                plan = queryset.explain(format='json')
+            return plan, self.postgres_issues(json.loads(plan)[0]['Plan'])
+        plan = queryset.explain()
+        return plan, self.sqlite_issues(plan)
+
+    def postgres_issues(self, node):
+        issues = []
+        if node['Node Type'] == 'Seq Scan':
+            issues.append(f"sequential scan on {node.get('Relation Name')}")
+        elif node['Node Type'] in ('Sort', 'Incremental Sort'):
+            issues.append(f"sort on {', '.join(node.get('Sort Key', []))}")
+        for child in node.get('Plans', []):
+            issues.extend(self.postgres_issues(child))
+        return issues
+
+    def sqlite_issues(self, plan):
+        issues = []
+        for line in plan.splitlines():
+            detail = line.split(' ', 3)[-1] if line[:1].isdigit() else line.strip()
+            if detail.startswith('SCAN') and 'INDEX' not in detail:
+                issues.append(f"sequential scan: {detail}")
+            elif 'USE TEMP B-TREE' in detail:
+                issues.append(f"sort step: {detail}")
+        return issues
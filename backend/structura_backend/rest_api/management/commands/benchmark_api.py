@@ -0,0 +1,141 @@
+import datetime
+import json
+import math
+import statistics
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+
+from app import models
+from app.management.commands.generate_scale_data import EMAIL_DOMAIN, PASSWORD
+from rest_api.middleware import QueryCounter
+
+# (name, method, URL template); templates are filled from generated rows
+ENDPOINTS = [
+    ('login', 'post', '/api/login/'),
+    ('projects by user', 'get', '/api/projects/?user_id={user_id}'),
+    ('project detail', 'get', '/api/projects/{project_id}/'),
+    ('project tree', 'get', '/api/projects/{project_id}/tree/'),
+    ('phases by project', 'get', '/api/phases/?project_id={project_id}'),
+    ('subtasks by phase', 'get', '/api/subtasks/?phase_id={phase_id}'),
+    ('assignments by subtask', 'get', '/api/subtask-assignments/?subtask_id={subtask_id}'),
+    ('field workers by project', 'get', '/api/field-workers/?project_id={project_id}'),
+    ('attendance by project and day', 'get', '/api/attendance/?project_id={project_id}&attendance_date={date}'),
+    ('attendance page', 'get', '/api/attendance/?project_id={project_id}&page_size=50'),
+    ('attendance by project', 'get', '/api/attendance/?project_id={project_id}'),
+    ('regions', 'get', '/api/regions/'),
+    ('address tree', 'get', '/api/address-tree/'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every rest_api endpoint in-process against data from "
+        "generate_scale_data and write p50/p95 latency and query counts to JSON. "
+        "With --baseline, fail when p95 or query counts regress."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--output', default='benchmark_results.json')
+        parser.add_argument('--only', action='append', default=[], help="Endpoint name to run (repeatable)")
+        parser.add_argument('--baseline', help="Earlier results file to compare against")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Allowed relative p95 slowdown versus the baseline")
+
+    def handle(self, *args, **options):
+        if options['iterations'] <= 0:
+            raise CommandError("--iterations must be positive")
+        params = self.sample_params()
+        client = APIClient()
+
+        results = []
+        for name, method, template in ENDPOINTS:
+            if options['only'] and name not in options['only']:
+                continue
+            url = template.format(**params)
+            result = self.measure(client, name, method, url, params, options['iterations'])
+            results.append(result)
+            self.stdout.write(
+                f"{name:<32} {result['status']}  p50 {result['p50_ms']:>9.2f} ms  "
+                f"p95 {result['p95_ms']:>9.2f} ms  {result['queries']:>5} queries"
+            )
+
+        report = {
+            'generated_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'endpoints': results,
+        }
+        Path(options['output']).write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def sample_params(self):
+        manager = models.User.objects.filter(
+            email__endswith=f'@{EMAIL_DOMAIN}', projects__isnull=False
+        ).first()
+        if manager is None:
+            raise CommandError("No generated data found; run generate_scale_data first")
+        project = manager.projects.order_by('project_id').first()
+        phase = project.phases.order_by('phase_id').first()
+        subtask = phase.subtasks.order_by('subtask_id').first() if phase else None
+        attendance = models.Attendance.objects.filter(project=project).order_by('-attendance_date').first()
+        return {
+            'email': manager.email,
+            'user_id': manager.user_id,
+            'project_id': project.project_id,
+            'phase_id': phase.phase_id if phase else 0,
+            'subtask_id': subtask.subtask_id if subtask else 0,
+            'date': attendance.attendance_date if attendance else datetime.date.today(),
+        }
+
+    def measure(self, client, name, method, url, params, iterations):
+        def request():
+            if method == 'post':
+                return client.post(url, {'email': params['email'], 'password': PASSWORD}, format='json')
+            return client.get(url)
+
+        request()  # warm up caches and connections
+        timings = []
+        counter = QueryCounter()
+        for _ in range(iterations):
+            counter.count = 0
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return {
+            'name': name,
+            'url': url,
+            'status': response.status_code,
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[math.ceil(0.95 * len(timings)) - 1], 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries': counter.count,
+            'bytes': len(response.content),
+        }
+
+    def compare(self, results, baseline_path, tolerance):
+        baseline = {
+            entry['name']: entry
+            for entry in json.loads(Path(baseline_path).read_text())['endpoints']
+        }
+        regressions = []
+        for result in results:
+            before = baseline.get(result['name'])
+            if before is None:
+                continue
+            if result['queries'] > before['queries']:
+                regressions.append(f"{result['name']}: queries {before['queries']} -> {result['queries']}")
+            if result['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+                regressions.append(f"{result['name']}: p95 {before['p95_ms']} -> {result['p95_ms']} ms")
+        if regressions:
+            raise CommandError("Regressions against baseline:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}"))
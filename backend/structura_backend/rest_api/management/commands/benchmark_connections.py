@@ -0,0 +1,65 @@
+import math
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database connection overhead: opening a fresh "
+        "connection for every request versus the configured reuse strategy "
+        "(persistent connections or the DB_POOL pool)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if options['requests'] <= 0:
+            raise CommandError("--requests must be positive")
+        pool = getattr(connection, 'pool', None)
+        strategy = 'pool' if pool is not None else f"CONN_MAX_AGE={connection.settings_dict['CONN_MAX_AGE']}"
+
+        fresh = self.measure(self.fresh_request, options['requests'])
+        reused = self.measure(self.reused_request, options['requests'])
+
+        self.report('fresh connection per request', fresh)
+        self.report(f'configured reuse ({strategy})', reused)
+        saved = statistics.median(fresh) - statistics.median(reused)
+        self.stdout.write(self.style.SUCCESS(f"Median overhead saved per request: {saved:.2f} ms"))
+        if pool is not None:
+            self.stdout.write(f"Pool stats: {pool.get_stats()}")
+
+    def fresh_request(self):
+        # What every request paid before: connect (TCP + TLS + auth), query, close
+        raw = connection.Database.connect(**connection.get_connection_params())
+        try:
+            cursor = raw.cursor()
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+            cursor.close()
+        finally:
+            raw.close()
+
+    def reused_request(self):
+        # Mirror Django's request_started / request_finished handling
+        close_old_connections()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        close_old_connections()
+
+    def measure(self, request, count):
+        request()  # warm up
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - started) * 1000)
+        return sorted(timings)
+
+    def report(self, label, timings):
+        p95 = timings[math.ceil(0.95 * len(timings)) - 1]
+        self.stdout.write(f"{label:<40} p50 {statistics.median(timings):>8.2f} ms  p95 {p95:>8.2f} ms")
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.models import Project
+from rest_api import crews
+
+
+class Command(BaseCommand):
+    help = (
+        "Move field workers from one project to another with a single UPDATE and "
+        "remove their assignments to subtasks of other projects, in one transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='from_project', type=int, required=True, help="Source project id")
+        parser.add_argument('--to', dest='to_project', type=int, required=True, help="Target project id")
+        parser.add_argument('--worker', type=int, action='append', help="Only these field worker ids (repeatable)")
+        parser.add_argument('--role', help="Only workers with this role")
+        parser.add_argument('--dry-run', action='store_true', help="Report the counts, then roll back")
+
+    def handle(self, *args, **options):
+        if options['from_project'] == options['to_project']:
+            raise CommandError("--from and --to must differ")
+        found = set(
+            Project.objects.filter(pk__in=[options['from_project'], options['to_project']])
+            .values_list('pk', flat=True)
+        )
+        for option in ('from_project', 'to_project'):
+            if options[option] not in found:
+                raise CommandError(f"Project {options[option]} does not exist")
+
+        workers = crews.crew_queryset(options['from_project'], options['worker'], options['role'])
+        with transaction.atomic():
+            result = crews.move_workers(workers, options['to_project'])
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        prefix = "Would move" if options['dry_run'] else "Moved"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {result['moved']} workers from project {options['from_project']} to "
+            f"{options['to_project']}, removing {result['assignments_removed']} subtask assignments"
+        ))
@@ -0,0 +1,157 @@
+"""
+Uploaded project images.
+
+An upload is stored once under a random key as media/<key>/original.<ext>
+in Django's "default" storage (the local filesystem unless STORAGES says
+otherwise), together with fixed-size JPEG thumbnails made with Pillow.
+Models keep only the key. The bytes behind a key never change,
+so they are served with a one-year immutable Cache-Control; a new image gets
+a new key. ETags are signed with SECRET_KEY, so a revalidation can be
+answered with a 304 without a query only for files this server has served.
+"""
+import io
+import re
+import secrets
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.urls import reverse
+from django.utils.crypto import salted_hmac
+from PIL import Image, ImageOps
+
+from app import models
+
+# Variant name -> (width, height); thumbnails are center-cropped to exactly this size
+THUMBNAIL_SIZES = {
+    'small': (160, 160),
+    'medium': (480, 360),
+}
+THUMBNAIL_QUALITY = 82
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+KEY_PATTERN = re.compile(r'^[0-9a-f]{20}$')
+
+# Leading bytes -> (content type, extension)
+SIGNATURES = [
+    (b'\xff\xd8\xff', ('image/jpeg', 'jpg')),
+    (b'\x89PNG\r\n\x1a\n', ('image/png', 'png')),
+    (b'GIF87a', ('image/gif', 'gif')),
+    (b'GIF89a', ('image/gif', 'gif')),
+]
+
+
+class InvalidUpload(ValueError):
+    pass
+
+
+def storage():
+    return storages['default']
+
+
+def path_for(key, variant, extension='jpg'):
+    if variant == 'original':
+        return f'media/{key}/original.{extension}'
+    return f'media/{key}/{variant}.jpg'
+
+
+def url_for(key, variant='original'):
+    return reverse('media_file', kwargs={'key': key, 'variant': variant})
+
+
+def etag_for(key, variant):
+    signature = salted_hmac('rest_api.media', f'{key}/{variant}').hexdigest()[:16]
+    return f'"{key}-{variant}-{signature}"'
+
+
+def image_url(value, variant='small'):
+    """
+    URL for a stored image field that holds a media key; None for legacy
+    values such as client-side asset paths.
+    """
+    if value and KEY_PATTERN.match(value):
+        return url_for(value, variant)
+    return None
+
+
+def sniff(data):
+    for signature, kind in SIGNATURES:
+        if data.startswith(signature):
+            return kind
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp', 'webp'
+    return None
+
+
+def store_upload(upload, project=None):
+    """Validate and store an uploaded image with its thumbnails; returns the MediaAsset."""
+    max_size = getattr(settings, 'MEDIA_MAX_UPLOAD_SIZE', 10 * 1024 * 1024)
+    if upload.size > max_size:
+        raise InvalidUpload(f'Images must be at most {max_size // (1024 * 1024)} MB')
+    data = upload.read()
+    kind = sniff(data)
+    if kind is None:
+        raise InvalidUpload('Only JPEG, PNG, GIF and WebP images are accepted')
+    content_type, extension = kind
+
+    try:
+        image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+        image.load()
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise InvalidUpload('The file is not a readable image') from exc
+    width, height = image.size
+    thumbnails = make_thumbnails(image)
+
+    key = secrets.token_hex(10)
+    store = storage()
+    store.save(path_for(key, 'original', extension), ContentFile(data))
+    for variant, thumbnail in thumbnails.items():
+        store.save(path_for(key, variant), ContentFile(thumbnail))
+
+    return models.MediaAsset.objects.create(
+        key=key,
+        project=project,
+        original_name=(upload.name or '')[:255],
+        content_type=content_type,
+        extension=extension,
+        size=len(data),
+        width=width,
+        height=height,
+        variants=list(thumbnails),
+    )
+
+
+def make_thumbnails(image):
+    if image.mode not in ('RGB', 'L'):
+        background = Image.new('RGB', image.size, 'white')
+        rgba = image.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        image = background
+    thumbnails = {}
+    for variant, size in THUMBNAIL_SIZES.items():
+        thumbnail = ImageOps.fit(image, size, method=Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+        thumbnails[variant] = buffer.getvalue()
+    return thumbnails
+
+
+def open_variant(asset, variant):
+    """Return (storage name, content type) for the original or a thumbnail."""
+    if variant == 'original':
+        return path_for(asset.key, 'original', asset.extension), asset.content_type
+    return path_for(asset.key, variant), 'image/jpeg'
+
+
+def asset_payload(asset):
+    return {
+        'key': asset.key,
+        'project': asset.project_id,
+        'content_type': asset.content_type,
+        'size': asset.size,
+        'width': asset.width,
+        'height': asset.height,
+        'urls': {
+            variant: url_for(asset.key, variant)
+            for variant in ['original', *THUMBNAIL_SIZES]
+        },
+    }
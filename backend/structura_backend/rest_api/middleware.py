@@ -0,0 +1,87 @@
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+from .authentication import TokenPrincipal
+
+logger = logging.getLogger('rest_api.requests')
+
+
+class QueryCounter:
+    """connection.execute_wrapper hook that counts queries without DEBUG."""
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self.lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+# The current request's counter; sync_to_async copies it into worker threads
+request_query_counter = contextvars.ContextVar('request_query_counter', default=None)
+
+
+@contextmanager
+def count_request_queries():
+    """
+    Count queries run on this thread's connection towards the current
+    request. Code that queries from its own worker threads (see
+    rest_api.dashboard) wraps its reads in this.
+    """
+    counter = request_query_counter.get()
+    if counter is None:
+        yield
+        return
+    with connection.execute_wrapper(counter):
+        yield
+
+
+class RequestLoggingMiddleware:
+    """
+    Logs route, status, duration, query count and principal for every
+    request through the queue-backed 'rest_api.requests' logger. Streaming
+    responses run their queries after the response is returned, so their
+    count is logged as null rather than as a partial number.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        token = request_query_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(counter):
+                response = self.get_response(request)
+        finally:
+            request_query_counter.reset(token)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        logger.info('request', extra={'fields': {
+            'method': request.method,
+            'path': request.path,
+            'route': match.route if match else None,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+            'queries': None if response.streaming else counter.count,
+            'principal': self.principal(request),
+        }})
+        return response
+
+    def principal(self, request):
+        # Only read a user DRF already authenticated; touching Django's lazy
+        # session user here would cost a query.
+        user = request.__dict__.get('user')
+        if type(user) is TokenPrincipal:
+            return str(user)
+        return None
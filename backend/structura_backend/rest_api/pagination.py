@@ -0,0 +1,141 @@
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite, indexed sort key.
+
+    Each view declares `pagination_ordering`, e.g.
+    ('-attendance_date', '-attendance_id'). The last field must be unique so
+    every row has a distinct position. Pages are fetched with a
+    `WHERE (key) > (cursor)` condition instead of an OFFSET, so every page
+    costs the same no matter how deep the client has scrolled.
+
+    Pagination is opt-in: existing clients that send neither `cursor` nor
+    `page_size` keep receiving the plain list.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 500
+    ordering = ('pk',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.ordering = tuple(getattr(view, 'pagination_ordering', self.ordering))
+        self.fields = [self._get_field(queryset.model, name) for name in self.ordering]
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        ordering = self._reversed_ordering() if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(position, ordering))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+        return self.encode_cursor(self._position(self.page[0]), reverse=True)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': reverse}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            raw_position = payload['p']
+            if len(raw_position) != len(self.fields):
+                raise ValueError('Cursor does not match ordering')
+            position = [
+                field.to_python(value) for field, value in zip(self.fields, raw_position)
+            ]
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _get_field(self, model, name):
+        name = name.lstrip('-')
+        if name == 'pk':
+            return model._meta.pk
+        return model._meta.get_field(name)
+
+    def _position(self, obj):
+        return [field.value_to_string(obj) for field in self.fields]
+
+    def _reversed_ordering(self):
+        return tuple(
+            name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering
+        )
+
+    def _after(self, position, ordering):
+        """
+        Lexicographic "comes after" condition for the given ordering:
+        (a > x) OR (a = x AND b > y) OR ...
+        """
+        condition = Q()
+        equal = Q()
+        for name, value in zip(ordering, position):
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            name = name.lstrip('-')
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
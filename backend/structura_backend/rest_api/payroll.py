@@ -0,0 +1,159 @@
+"""
+Payroll from Attendance x FieldWorker.payrate.
+
+`payrate` is a daily rate for an 8 hour day. Worked time per attendance row is
+the stored Attendance.worked_minutes (check-out minus check-in, less the
+break). Time beyond 8 hours a day is overtime, paid at 125% of the hourly rate.
+
+Attendance is read with one values_list query straight into NumPy arrays
+and computed per worker as whole arrays. Money is kept in integer centavos
+and rounded half up once per worker, so totals are exact.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+
+from app import models
+
+REGULAR_MINUTES_PER_DAY = 8 * 60
+OVERTIME_MULTIPLIER = Decimal('1.25')
+
+CENTS = Decimal('0.01')
+ATTENDANCE_DTYPE = np.dtype([('worker', np.int64), ('worked', np.int64)])
+
+
+def fetch_attendance_columns(project_id, start_date, end_date):
+    """Worker ids and worked minutes for the period as a structured array."""
+    rows = models.Attendance.objects.filter(
+        project_id=project_id,
+        attendance_date__range=(start_date, end_date),
+    ).values_list('field_worker_id', 'worked_minutes')
+    return np.fromiter(rows.iterator(chunk_size=5000), dtype=ATTENDANCE_DTYPE)
+
+
+def _divide_rounded(numerator, denominator):
+    """Integer division rounding half up, for non-negative int64 arrays."""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def pay_centavos(regular_minutes, overtime_minutes, daily_rate):
+    """
+    (regular pay, overtime pay) in centavos for minutes worked at a daily
+    rate in centavos. Works on ints and on int64 arrays alike.
+    """
+    overtime_numerator, overtime_denominator = OVERTIME_MULTIPLIER.as_integer_ratio()
+    return (
+        _divide_rounded(regular_minutes * daily_rate, REGULAR_MINUTES_PER_DAY),
+        _divide_rounded(
+            overtime_minutes * daily_rate * overtime_numerator,
+            REGULAR_MINUTES_PER_DAY * overtime_denominator,
+        ),
+    )
+
+
+def worker_totals(columns, rates):
+    """
+    Minutes and pay per worker. `rates` maps worker id to the daily rate in
+    centavos; pay is returned in centavos.
+    """
+    worker_ids, worker_index = np.unique(columns['worker'], return_inverse=True)
+    worked = columns['worked']
+    regular = np.minimum(worked, REGULAR_MINUTES_PER_DAY)
+
+    def per_worker(values):
+        sums = np.zeros(len(worker_ids), dtype=np.int64)
+        np.add.at(sums, worker_index, values)
+        return sums
+
+    worked_minutes = per_worker(worked)
+    regular_minutes = per_worker(regular)
+    overtime_minutes = worked_minutes - regular_minutes
+    daily_rate = np.array([rates.get(int(pk), 0) for pk in worker_ids], dtype=np.int64)
+    regular_pay, overtime_pay = pay_centavos(regular_minutes, overtime_minutes, daily_rate)
+
+    sums = {
+        'days_worked': per_worker((worked > 0).astype(np.int64)),
+        'worked_minutes': worked_minutes,
+        'regular_minutes': regular_minutes,
+        'overtime_minutes': overtime_minutes,
+        'regular_pay': regular_pay,
+        'overtime_pay': overtime_pay,
+    }
+    return {
+        int(pk): {name: int(values[index]) for name, values in sums.items()}
+        for index, pk in enumerate(worker_ids)
+    }
+
+
+def compute_payroll(project_id, start_date, end_date):
+    """Per-worker hours and pay for a project and inclusive date range."""
+    columns = fetch_attendance_columns(project_id, start_date, end_date)
+    workers = {
+        pk: (first_name, last_name, role, payrate)
+        for pk, first_name, last_name, role, payrate in models.FieldWorker.objects.filter(
+            pk__in=np.unique(columns['worker']).tolist()
+        ).values_list('pk', 'first_name', 'last_name', 'role', 'payrate')
+    }
+    rates = {pk: centavos(worker[3]) for pk, worker in workers.items()}
+    totals = worker_totals(columns, rates)
+
+    entries = []
+    for worker_id, total in totals.items():
+        first_name, last_name, role, payrate = workers.get(worker_id, ('', '', '', None))
+        regular_pay = pesos(total['regular_pay'])
+        overtime_pay = pesos(total['overtime_pay'])
+        entries.append({
+            'field_worker_id': worker_id,
+            'worker_name': f"{first_name} {last_name}".strip(),
+            'role': role,
+            'payrate': payrate,
+            'days_worked': total['days_worked'],
+            'worked_hours': _hours(total['worked_minutes']),
+            'regular_hours': _hours(total['regular_minutes']),
+            'overtime_hours': _hours(total['overtime_minutes']),
+            'regular_pay': regular_pay,
+            'overtime_pay': overtime_pay,
+            'gross_pay': regular_pay + overtime_pay,
+        })
+    entries.sort(key=lambda entry: entry['worker_name'])
+
+    return {
+        'project': project_id,
+        'start_date': start_date,
+        'end_date': end_date,
+        'finalized': False,
+        'total_worked_hours': sum((entry['worked_hours'] for entry in entries), Decimal('0.00')),
+        'total_gross_pay': sum((entry['gross_pay'] for entry in entries), Decimal('0.00')),
+        'entries': entries,
+    }
+
+
+def _hours(minutes):
+    return (Decimal(minutes) / 60).quantize(CENTS)
+
+
+def centavos(amount):
+    return int((amount or 0) * 100)
+
+
+def pesos(amount_centavos):
+    return (Decimal(amount_centavos) / 100).quantize(CENTS)
+
+
+@transaction.atomic
+def finalize_payroll(project_id, start_date, end_date):
+    """Compute the period once and store it as a PayrollPeriod snapshot."""
+    payroll = compute_payroll(project_id, start_date, end_date)
+    period = models.PayrollPeriod.objects.create(
+        project_id=project_id,
+        start_date=start_date,
+        end_date=end_date,
+        total_worked_hours=payroll['total_worked_hours'],
+        total_gross_pay=payroll['total_gross_pay'],
+    )
+    models.PayrollEntry.objects.bulk_create([
+        models.PayrollEntry(period=period, **entry)
+        for entry in payroll['entries']
+    ])
+    return period
@@ -0,0 +1,153 @@
+"""
+Report aggregates for the project manager and supervisor report screens.
+
+Every report is one GROUP BY query over indexed columns (attendance by
+project and date, the stored worked_minutes, the phase progress counters).
+Results are cached per project and date range under the project's data
+version from rest_api.response_cache, which is bumped whenever its
+attendance, workers, phases, subtasks or the project itself change (see
+rest_api.signals), so a cached report is never served after its rows have
+changed.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Q, Sum, Value
+from django.db.models.functions import Least
+
+from app import models
+
+from . import payroll
+from .response_cache import get_version
+
+PRESENT_STATUSES = ('on_site', 'on_break')
+
+
+def cached_report(name, project_id, start_date=None, end_date=None):
+    """Return report `name` for the project and range, building it on a cache miss."""
+    if name in UNDATED_REPORTS:
+        start_date = end_date = None
+    key = f'rest_api:reports:{name}:{project_id}:{get_version(project_id)}:{start_date}:{end_date}'
+    result = cache.get(key)
+    if result is None:
+        builder = REPORTS[name]
+        result = builder(project_id, start_date, end_date)
+        cache.set(key, result, timeout=getattr(settings, 'REPORTS_CACHE_TIMEOUT', 15 * 60))
+    return result
+
+
+def attendance_report(project_id, start_date, end_date):
+    """Per-day present/absent counts, attendance rate against the roster and hours worked."""
+    headcount = models.FieldWorker.objects.filter(project_id=project_id).count()
+    rows = (
+        models.Attendance.objects
+        .filter(project_id=project_id, attendance_date__range=(start_date, end_date))
+        .values('attendance_date')
+        .annotate(
+            present=Count('pk', filter=Q(status__in=PRESENT_STATUSES)),
+            absent=Count('pk', filter=Q(status='absent')),
+            worked_minutes=Sum('worked_minutes'),
+        )
+        .order_by('attendance_date')
+    )
+    days = [
+        {
+            'date': row['attendance_date'],
+            'present': row['present'],
+            'absent': row['absent'],
+            'attendance_rate': round(row['present'] / headcount, 4) if headcount else None,
+            'worked_hours': round((row['worked_minutes'] or 0) / 60, 2),
+        }
+        for row in rows
+    ]
+    return {
+        'headcount': headcount,
+        'days': days,
+        'total_worked_hours': round(sum(day['worked_hours'] for day in days), 2),
+    }
+
+
+def workforce_report(project_id, start_date=None, end_date=None):
+    """Headcount, average and total daily rate by FieldWorker.role."""
+    roles = list(
+        models.FieldWorker.objects
+        .filter(project_id=project_id)
+        .values('role')
+        .annotate(headcount=Count('pk'), average_payrate=Avg('payrate'), daily_payroll=Sum('payrate'))
+        .order_by('role')
+    )
+    return {
+        'headcount': sum(role['headcount'] for role in roles),
+        'roles': roles,
+    }
+
+
+def progress_report(project_id, start_date=None, end_date=None):
+    """Phase completion from the stored progress counters; reads no subtasks."""
+    project = models.Project.objects.filter(pk=project_id).values(*models.Project.PROGRESS_FIELDS).first()
+    phases = list(
+        models.Phase.objects
+        .filter(project_id=project_id)
+        .order_by('created_at', 'phase_id')
+        .values('phase_id', 'phase_name', 'status', 'total_subtasks', 'completed_subtasks')
+    )
+    for phase in phases:
+        phase['completion'] = _ratio(phase['completed_subtasks'], phase['total_subtasks'])
+    return {
+        **project,
+        'completion': _ratio(project['completed_subtasks'], project['total_subtasks']),
+        'phases_by_status': dict(
+            models.Phase.objects.filter(project_id=project_id)
+            .values_list('status').annotate(count=Count('pk')).order_by()
+        ),
+        'phases': phases,
+    }
+
+
+def budget_report(project_id, start_date, end_date):
+    """
+    Budget against labor cost accrued from attendance in the range. Minutes
+    are summed per worker in the database and priced with payroll's centavo
+    arithmetic, so labor_cost equals the payroll total for the same range.
+    Money is returned as two-place decimal strings, like payroll.
+    """
+    workers = (
+        models.Attendance.objects
+        .filter(project_id=project_id, attendance_date__range=(start_date, end_date))
+        .values('field_worker_id', 'field_worker__payrate')
+        .annotate(
+            worked=Sum('worked_minutes'),
+            regular=Sum(Least(F('worked_minutes'), Value(payroll.REGULAR_MINUTES_PER_DAY))),
+        )
+        .order_by()
+    )
+    labor_cost = 0
+    for worker in workers:
+        labor_cost += sum(payroll.pay_centavos(
+            worker['regular'], worker['worked'] - worker['regular'], payroll.centavos(worker['field_worker__payrate'])
+        ))
+    finalized_payroll = models.PayrollPeriod.objects.filter(
+        project_id=project_id, start_date__lte=end_date, end_date__gte=start_date
+    ).aggregate(total=Sum('total_gross_pay'))['total']
+    budget = payroll.centavos(models.Project.objects.filter(pk=project_id).values_list('budget', flat=True).first())
+
+    return {
+        'budget': str(payroll.pesos(budget)),
+        'labor_cost': str(payroll.pesos(labor_cost)),
+        'finalized_payroll': str(payroll.pesos(payroll.centavos(finalized_payroll))),
+        'remaining': str(payroll.pesos(budget - labor_cost)),
+        'spent_ratio': _ratio(labor_cost, budget),
+    }
+
+
+def _ratio(part, whole):
+    return round(part / whole, 4) if whole else 0.0
+
+
+REPORTS = {
+    'attendance': attendance_report,
+    'workforce': workforce_report,
+    'progress': progress_report,
+    'budget': budget_report,
+}
+# Reports that do not depend on the date range share one cache entry
+UNDATED_REPORTS = {'workforce', 'progress'}
@@ -0,0 +1,51 @@
+"""
+Non-blocking structured logging.
+
+Records are pushed onto an in-memory queue by the request thread and written
+as JSON lines by a background QueueListener, so emitting a log line never
+waits on stdout or a file.
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any `extra={'fields': {...}}` data."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    QueueHandler that owns its listener thread. The listener writes to
+    `stream` (stderr by default) using JsonFormatter.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        target = logging.StreamHandler(stream or sys.stderr)
+        target.setFormatter(JsonFormatter())
+        self.listener = QueueListener(self.queue, target, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Drop rather than block the request when the writer falls behind
+            pass
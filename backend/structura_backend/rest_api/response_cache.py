@@ -0,0 +1,115 @@
+"""
+Per-project response cache.
+
+Read endpoints scoped to one project (its phases list, its detail and tree)
+are cached in Django's cache keyed by endpoint, project and query string.
+Every project has a data version in the cache; rest_api.signals bumps it
+after any committed write to the project or its phases, subtasks,
+assignments, workers or attendance, which makes every cached response of
+that project stale at once. The report aggregates in rest_api.reports use
+the same version.
+
+Stale-while-revalidate: when an entry is stale (expired or invalidated), one
+request takes a short lock and rebuilds it; requests arriving during the
+rebuild are answered from the stale copy for up to
+RESPONSE_CACHE_STALE_TIMEOUT seconds, so a burst of readers after a write
+does not turn into a burst of identical queries. With the local-memory
+backend each process keeps its own cache and versions; use the file backend
+(CACHE_BACKEND=file) or another shared cache when running several workers.
+"""
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+
+def _version_key(project_id):
+    return f'rest_api:project:{project_id}:version'
+
+
+def get_version(project_id):
+    key = _version_key(project_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate(project_id):
+    cache.set(_version_key(project_id), uuid.uuid4().hex, timeout=None)
+
+
+def _timeouts():
+    fresh = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 5 * 60)
+    stale = getattr(settings, 'RESPONSE_CACHE_STALE_TIMEOUT', 60)
+    return fresh, stale
+
+
+def cached_response(endpoint, project_id, request, build):
+    """
+    Return the cached Response for `endpoint` of `project_id` and this query
+    string, calling `build()` to produce it when missing or stale. Only 200
+    responses are stored.
+    """
+    query = hashlib.sha1(request.META.get('QUERY_STRING', '').encode()).hexdigest()[:16]
+    key = f'rest_api:response:{endpoint}:{project_id}:{query}'
+    fresh_for, stale_for = _timeouts()
+    version = get_version(project_id)
+    entry = cache.get(key)
+    now = time.time()
+
+    if entry is not None:
+        if entry['version'] == version and now - entry['stored_at'] < fresh_for:
+            return _from_entry(entry, 'HIT')
+        if not cache.add(f'{key}:rebuilding', 1, timeout=stale_for):
+            return _from_entry(entry, 'STALE')
+
+    try:
+        response = build()
+        if response.status_code == 200:
+            cache.set(key, {
+                'version': version,
+                'stored_at': now,
+                'data': response.data,
+            }, timeout=fresh_for + stale_for)
+    finally:
+        if entry is not None:
+            cache.delete(f'{key}:rebuilding')
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def _from_entry(entry, state):
+    response = Response(entry['data'])
+    response['X-Cache'] = state
+    return response
+
+
+class ProjectResponseCacheMixin:
+    """
+    Cache the viewset actions listed in `cached_actions` per project. The
+    project comes from `cache_project_id()`; requests it returns None for are
+    not cached.
+    """
+    cached_actions = ()
+
+    def cache_project_id(self):
+        return None
+
+    def dispatch_cached(self, handler, request, *args, **kwargs):
+        project_id = self.cache_project_id()
+        if self.action not in self.cached_actions or project_id is None:
+            return handler(request, *args, **kwargs)
+        endpoint = f'{self.basename}-{self.action}'
+        return cached_response(endpoint, project_id, request, lambda: handler(request, *args, **kwargs))
+
+    def list(self, request, *args, **kwargs):
+        return self.dispatch_cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.dispatch_cached(super().retrieve, request, *args, **kwargs)
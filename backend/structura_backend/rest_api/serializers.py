@@ -1,8 +1,23 @@
+import datetime
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
 from rest_framework import serializers
 from app import models
+from . import media
+from .fieldsets import SparseFieldsetMixin
+
+
+def assigned_workers_prefetch(lookup='assigned_workers'):
+    """Prefetch subtask assignments together with their field workers."""
+    return Prefetch(
+        lookup,
+        queryset=models.SubtaskFieldWorker.objects.select_related('field_worker'),
+    )
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.User
         fields = [
@@ -42,31 +57,32 @@ class UserSerializer(serializers.ModelSerializer):
         return instance
 
 
-class RegionSerializer(serializers.ModelSerializer):
+class RegionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Region
         fields = ['id', 'code', 'name']
 
 
-class ProvinceSerializer(serializers.ModelSerializer):
+class ProvinceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Province
         fields = ['id', 'code', 'name', 'region']
 
 
-class CitySerializer(serializers.ModelSerializer):
+class CitySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.City
         fields = ['id', 'code', 'name', 'province']
 
 
-class BarangaySerializer(serializers.ModelSerializer):
+class BarangaySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Barangay
         fields = ['id', 'code', 'name', 'city']
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    project_image_thumbnail = serializers.SerializerMethodField()
     region_name = serializers.CharField(source='region.name', read_only=True)
     province_name = serializers.CharField(source='province.name', read_only=True)
     city_name = serializers.CharField(source='city.name', read_only=True)
@@ -77,6 +93,7 @@ class ProjectSerializer(serializers.ModelSerializer):
         fields = [
             'project_id',
             'project_image',
+            'project_image_thumbnail',
             'project_name',
             'description',
             'user',
@@ -97,14 +114,25 @@ class ProjectSerializer(serializers.ModelSerializer):
             'supervisor',
             'budget',
             'status',
+            'total_phases',
+            'completed_phases',
+            'total_subtasks',
+            'completed_subtasks',
             'created_at',
         ]
         extra_kwargs = {
             'user': {'required': False, 'allow_null': True},
             'project_id': {'read_only': True},
             'created_at': {'read_only': True},
+            **{field: {'read_only': True} for field in models.Project.PROGRESS_FIELDS},
+        }
+        field_lookups = {
+            'project_image_thumbnail': ['project_image'],
         }
     
+    def get_project_image_thumbnail(self, obj):
+        return media.image_url(obj.project_image, 'small')
+
     def create(self, validated_data):
         # Create the project first
         project = models.Project.objects.create(**validated_data)
@@ -162,7 +190,39 @@ class ProjectSerializer(serializers.ModelSerializer):
         return instance
 
 
-class SupervisorsSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(ProjectSerializer):
+    """
+    Compact project card for the projects list: identity, schedule, location
+    names and the stored progress counters. The detail endpoint returns the
+    full ProjectSerializer.
+    """
+
+    class Meta(ProjectSerializer.Meta):
+        fields = [
+            'project_id',
+            'project_name',
+            'project_image',
+            'project_image_thumbnail',
+            'project_type',
+            'status',
+            'start_date',
+            'end_date',
+            'budget',
+            'street',
+            'barangay',
+            'city',
+            'barangay_name',
+            'city_name',
+            'province_name',
+            'region_name',
+            'total_subtasks',
+            'completed_subtasks',
+            'created_at',
+        ]
+        read_only_fields = fields
+
+
+class SupervisorsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Supervisors
         fields = [
@@ -203,7 +263,7 @@ class SupervisorsSerializer(serializers.ModelSerializer):
         return supervisor
 
 
-class SupervisorSerializer(serializers.ModelSerializer):
+class SupervisorSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Supervisors
         fields = [
@@ -244,7 +304,7 @@ class SupervisorSerializer(serializers.ModelSerializer):
         return supervisor
 
 
-class FieldWorkerSerializer(serializers.ModelSerializer):
+class FieldWorkerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.FieldWorker
         fields = [
@@ -276,7 +336,38 @@ class FieldWorkerSerializer(serializers.ModelSerializer):
         return field_worker
 
 
-class ClientSerializer(serializers.ModelSerializer):
+class FieldWorkerImportRowSerializer(serializers.ModelSerializer):
+    """One row of a bulk field worker import; the project comes from the request."""
+    GOVERNMENT_ID_FIELDS = ('sss_id', 'philhealth_id', 'pagibig_id')
+
+    class Meta:
+        model = models.FieldWorker
+        fields = [
+            'first_name',
+            'middle_name',
+            'last_name',
+            'phone_number',
+            'birthdate',
+            'role',
+            'sss_id',
+            'philhealth_id',
+            'pagibig_id',
+            'payrate',
+        ]
+
+    def to_internal_value(self, data):
+        if not isinstance(data, dict):
+            return super().to_internal_value(data)
+        # CSV cells are never missing, only empty
+        data = {
+            key: value.strip() if isinstance(value, str) else value
+            for key, value in data.items()
+            if key in self.fields and value not in ('', None)
+        }
+        return super().to_internal_value(data)
+
+
+class ClientSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Client
         fields = [
@@ -325,7 +416,7 @@ class ClientSerializer(serializers.ModelSerializer):
         return client
 
 
-class SubtaskSerializer(serializers.ModelSerializer):
+class SubtaskSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     assigned_workers = serializers.SerializerMethodField()
 
     class Meta:
@@ -347,9 +438,13 @@ class SubtaskSerializer(serializers.ModelSerializer):
             'updated_at': {'read_only': True},
             'progress_notes': {'required': False, 'allow_blank': True, 'allow_null': True},
         }
+        field_lookups = {
+            'assigned_workers': [assigned_workers_prefetch()],
+        }
 
     def get_assigned_workers(self, obj):
-        assignments = obj.assigned_workers.select_related('field_worker')
+        # .all() so assignments prefetched by the view are reused
+        assignments = obj.assigned_workers.all()
         workers = []
         for assignment in assignments:
             worker = assignment.field_worker
@@ -363,9 +458,23 @@ class SubtaskSerializer(serializers.ModelSerializer):
         return workers
 
 
-class PhaseSerializer(serializers.ModelSerializer):
-    subtasks = SubtaskSerializer(many=True, required=False)
-    project_id = serializers.IntegerField(source='project.project_id', read_only=True)
+class PhaseSubtaskSerializer(SubtaskSerializer):
+    """
+    Subtask nested in a phase payload. Accepts `subtask_id` so existing rows
+    can be matched and updated in place instead of being recreated.
+    """
+    subtask_id = serializers.IntegerField(required=False)
+
+    class Meta(SubtaskSerializer.Meta):
+        extra_kwargs = {
+            **SubtaskSerializer.Meta.extra_kwargs,
+            'phase': {'read_only': True},
+        }
+
+
+class PhaseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    subtasks = PhaseSubtaskSerializer(many=True, required=False)
+    project_id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = models.Phase
@@ -377,25 +486,31 @@ class PhaseSerializer(serializers.ModelSerializer):
             'description',
             'days_duration',
             'status',
+            'total_subtasks',
+            'completed_subtasks',
             'created_at',
             'updated_at',
             'subtasks',
         ]
         extra_kwargs = {
             'phase_id': {'read_only': True},
+            'total_subtasks': {'read_only': True},
+            'completed_subtasks': {'read_only': True},
             'created_at': {'read_only': True},
             'updated_at': {'read_only': True},
         }
+        field_lookups = {
+            'subtasks': ['subtasks', assigned_workers_prefetch('subtasks__assigned_workers')],
+        }
 
+    @transaction.atomic
     def create(self, validated_data):
         subtasks_data = validated_data.pop('subtasks', [])
         phase = models.Phase.objects.create(**validated_data)
-        
-        for subtask_data in subtasks_data:
-            models.Subtask.objects.create(phase=phase, **subtask_data)
-        
+        self.sync_subtasks(phase, subtasks_data, existing={})
         return phase
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         subtasks_data = validated_data.pop('subtasks', None)
         
@@ -404,15 +519,112 @@ class PhaseSerializer(serializers.ModelSerializer):
         instance.save()
         
         if subtasks_data is not None:
-            # Delete existing subtasks and recreate
-            instance.subtasks.all().delete()
-            for subtask_data in subtasks_data:
-                models.Subtask.objects.create(phase=instance, **subtask_data)
+            existing = {subtask.subtask_id: subtask for subtask in instance.subtasks.all()}
+            self.sync_subtasks(instance, subtasks_data, existing)
         
         return instance
 
+    def sync_subtasks(self, phase, subtasks_data, existing):
+        """
+        Diff the submitted subtasks against `existing` by subtask_id: rows
+        without an id are bulk-created, changed rows are bulk-updated and rows
+        left out of the payload are deleted. Kept rows keep their id and their
+        worker assignments.
+        """
+        to_create = []
+        to_update = []
+        changed_fields = set()
+        kept_ids = set()
+        completed_delta = 0
+
+        for subtask_data in subtasks_data:
+            subtask_data = dict(subtask_data)
+            subtask_id = subtask_data.pop('subtask_id', None)
+            if subtask_id is None:
+                to_create.append(models.Subtask(phase=phase, **subtask_data))
+                continue
+
+            if subtask_id in kept_ids:
+                raise serializers.ValidationError({
+                    'subtasks': [f'Subtask {subtask_id} is listed more than once']
+                })
+            subtask = existing.get(subtask_id)
+            if subtask is None:
+                raise serializers.ValidationError({
+                    'subtasks': [f'Subtask {subtask_id} does not belong to this phase']
+                })
+            kept_ids.add(subtask_id)
+
+            changed = [
+                field for field, value in subtask_data.items()
+                if getattr(subtask, field) != value
+            ]
+            if 'status' in changed:
+                completed_delta += (subtask_data['status'] == 'completed') - (subtask.status == 'completed')
+            if changed:
+                for field in changed:
+                    setattr(subtask, field, subtask_data[field])
+                subtask.updated_at = timezone.now()
+                changed_fields.update(changed)
+                to_update.append(subtask)
+
+        removed_ids = set(existing) - kept_ids
+        if removed_ids:
+            models.Subtask.objects.filter(pk__in=removed_ids).delete()
+        if to_update:
+            models.Subtask.objects.bulk_update(to_update, [*changed_fields, 'updated_at'])
+        if to_create:
+            models.Subtask.objects.bulk_create(to_create)
+
+        # The queryset delete, bulk_create and bulk_update all skip the
+        # per-row counting in Subtask.save()/delete(); apply the net change once
+        completed_delta += sum(1 for subtask in to_create if subtask.status == 'completed')
+        completed_delta -= sum(1 for pk in removed_ids if existing[pk].status == 'completed')
+        models.Phase.adjust_subtask_counts(
+            phase.phase_id,
+            total=len(to_create) - len(removed_ids),
+            completed=completed_delta,
+        )
+        phase.refresh_from_db(fields=['total_subtasks', 'completed_subtasks'])
+
+
+class ProjectTreeSerializer(ProjectSerializer):
+    """
+    Read-only project with its phases, subtasks, assigned workers and
+    roll-up counts. Expects the view to prefetch every relation.
+    """
+    phases = PhaseSerializer(many=True, read_only=True)
+    field_workers = FieldWorkerSerializer(many=True, read_only=True)
+    summary = serializers.SerializerMethodField()
+
+    class Meta(ProjectSerializer.Meta):
+        fields = ProjectSerializer.Meta.fields + [
+            'phases',
+            'field_workers',
+            'summary',
+        ]
+
+    def get_summary(self, obj):
+        phases = obj.phases.all()
+        subtasks = [subtask for phase in phases for subtask in phase.subtasks.all()]
+        assigned_worker_ids = {
+            assignment.field_worker_id
+            for subtask in subtasks
+            for assignment in subtask.assigned_workers.all()
+        }
+        return {
+            'total_phases': len(phases),
+            'completed_phases': sum(1 for phase in phases if phase.status == 'completed'),
+            'in_progress_phases': sum(1 for phase in phases if phase.status == 'in_progress'),
+            'total_subtasks': len(subtasks),
+            'completed_subtasks': sum(1 for subtask in subtasks if subtask.status == 'completed'),
+            'in_progress_subtasks': sum(1 for subtask in subtasks if subtask.status == 'in_progress'),
+            'total_field_workers': len(obj.field_workers.all()),
+            'assigned_field_workers': len(assigned_worker_ids),
+        }
+
 
-class SubtaskFieldWorkerSerializer(serializers.ModelSerializer):
+class SubtaskFieldWorkerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.SubtaskFieldWorker
         fields = [
@@ -427,7 +639,7 @@ class SubtaskFieldWorkerSerializer(serializers.ModelSerializer):
         }
 
 
-class AttendanceSerializer(serializers.ModelSerializer):
+class AttendanceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     field_worker_name = serializers.SerializerMethodField()
     
     class Meta:
@@ -443,14 +655,118 @@ class AttendanceSerializer(serializers.ModelSerializer):
             'break_in_time',
             'break_out_time',
             'status',
+            'worked_minutes',
+            'break_minutes',
             'created_at',
             'updated_at',
         ]
         extra_kwargs = {
             'attendance_id': {'read_only': True},
+            'worked_minutes': {'read_only': True},
+            'break_minutes': {'read_only': True},
             'created_at': {'read_only': True},
             'updated_at': {'read_only': True},
         }
+        field_lookups = {
+            'field_worker_name': ['field_worker__first_name', 'field_worker__last_name'],
+        }
     
     def get_field_worker_name(self, obj):
-        return f"{obj.field_worker.first_name} {obj.field_worker.last_name}"
\ No newline at end of file
+        return f"{obj.field_worker.first_name} {obj.field_worker.last_name}"
+
+class AttendanceBulkRowSerializer(serializers.Serializer):
+    """One row of a bulk attendance upsert; omitted times are left untouched."""
+    field_worker = serializers.IntegerField()
+    attendance_date = serializers.DateField()
+    check_in_time = serializers.TimeField(required=False, allow_null=True)
+    check_out_time = serializers.TimeField(required=False, allow_null=True)
+    break_in_time = serializers.TimeField(required=False, allow_null=True)
+    break_out_time = serializers.TimeField(required=False, allow_null=True)
+    status = serializers.ChoiceField(choices=models.Attendance.STATUS_CHOICES, required=False)
+
+
+class PayrollRequestSerializer(serializers.Serializer):
+    project = serializers.PrimaryKeyRelatedField(queryset=models.Project.objects.all())
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, data):
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError('start_date must be on or before end_date')
+        return data
+
+
+class ReportRequestSerializer(serializers.Serializer):
+    project = serializers.PrimaryKeyRelatedField(queryset=models.Project.objects.all())
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, data):
+        # Default to the 30 days ending today
+        data.setdefault('end_date', timezone.localdate())
+        data.setdefault('start_date', data['end_date'] - datetime.timedelta(days=29))
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError('start_date must be on or before end_date')
+        return data
+
+
+class WorkerReassignSerializer(serializers.Serializer):
+    from_project = serializers.PrimaryKeyRelatedField(queryset=models.Project.objects.all())
+    to_project = serializers.PrimaryKeyRelatedField(queryset=models.Project.objects.all())
+    field_workers = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    role = serializers.CharField(required=False)
+
+    def validate(self, data):
+        if data['from_project'] == data['to_project']:
+            raise serializers.ValidationError('from_project and to_project must differ')
+        return data
+
+
+class ExportRequestSerializer(serializers.Serializer):
+    project_id = serializers.PrimaryKeyRelatedField(queryset=models.Project.objects.all())
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if data.get('start_date') and data.get('end_date') and data['start_date'] > data['end_date']:
+            raise serializers.ValidationError('start_date must be on or before end_date')
+        return data
+
+
+class PayrollEntrySerializer(serializers.ModelSerializer):
+    field_worker = serializers.IntegerField(source='field_worker_id', read_only=True, allow_null=True)
+
+    class Meta:
+        model = models.PayrollEntry
+        fields = [
+            'field_worker',
+            'worker_name',
+            'role',
+            'payrate',
+            'days_worked',
+            'worked_hours',
+            'regular_hours',
+            'overtime_hours',
+            'regular_pay',
+            'overtime_pay',
+            'gross_pay',
+        ]
+
+
+class PayrollPeriodSerializer(serializers.ModelSerializer):
+    finalized = serializers.BooleanField(default=True, read_only=True)
+    entries = PayrollEntrySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = models.PayrollPeriod
+        fields = [
+            'payroll_period_id',
+            'project',
+            'start_date',
+            'end_date',
+            'finalized',
+            'finalized_at',
+            'total_worked_hours',
+            'total_gross_pay',
+            'entries',
+        ]
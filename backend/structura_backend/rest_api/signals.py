@@ -0,0 +1,119 @@
+import threading
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from app.models import (
+    Attendance, Barangay, City, FieldWorker, PayrollPeriod, Phase, Project, Province, Region, Subtask,
+    SubtaskFieldWorker,
+)
+
+from . import address_bundle, response_cache
+
+
+@receiver(post_save, sender=Region)
+@receiver(post_save, sender=Province)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Barangay)
+@receiver(post_delete, sender=Region)
+@receiver(post_delete, sender=Province)
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=Barangay)
+def invalidate_address_bundle(sender, **kwargs):
+    address_bundle.invalidate()
+
+
+def _project_id(instance):
+    if isinstance(instance, Project):
+        return instance.pk
+    if isinstance(instance, FieldWorker):
+        return instance.project_id_id
+    if isinstance(instance, Subtask):
+        if Subtask.phase.field.is_cached(instance):
+            return instance.phase.project_id
+        return Phase.objects.filter(pk=instance.phase_id).values_list('project_id', flat=True).first()
+    if isinstance(instance, SubtaskFieldWorker):
+        return Phase.objects.filter(subtasks=instance.subtask_id).values_list('project_id', flat=True).first()
+    return instance.project_id
+
+
+def _invalidate_on_commit(project_id):
+    # After commit, so a response built meanwhile from the old rows is not
+    # cached under the new version
+    transaction.on_commit(lambda: response_cache.invalidate(project_id))
+
+
+@receiver(post_init, sender=FieldWorker)
+def remember_field_worker_project(sender, instance, **kwargs):
+    instance._loaded_project_id = instance.__dict__.get('project_id_id')
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_save, sender=FieldWorker)
+@receiver(post_save, sender=Phase)
+@receiver(post_save, sender=Subtask)
+@receiver(post_save, sender=SubtaskFieldWorker)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=PayrollPeriod)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_delete, sender=FieldWorker)
+@receiver(post_delete, sender=Phase)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=PayrollPeriod)
+def invalidate_project_caches(sender, instance, **kwargs):
+    """Expire the project's cached responses and reports once the write commits."""
+    project_id = _project_id(instance)
+    if project_id is not None:
+        _invalidate_on_commit(project_id)
+    if isinstance(instance, FieldWorker):
+        # A worker moved to another project leaves the old one stale as well
+        previous = instance._loaded_project_id
+        if previous is not None and previous != project_id:
+            _invalidate_on_commit(previous)
+        instance._loaded_project_id = project_id
+
+
+class PendingDeletes(threading.local):
+    """
+    Phases and subtasks whose project is stale after subtask and assignment
+    deletes. A queryset or cascade delete signals every row; collecting their
+    parents and resolving them in one query at commit keeps that delete from
+    running a project lookup per row.
+    """
+
+    def __init__(self):
+        self.phase_ids = set()
+        self.subtask_ids = set()
+
+    def flush(self):
+        phase_ids, self.phase_ids = self.phase_ids, set()
+        subtask_ids, self.subtask_ids = self.subtask_ids, set()
+        if not phase_ids and not subtask_ids:
+            return
+        project_ids = Phase.objects.filter(
+            Q(pk__in=phase_ids) | Q(subtasks__in=subtask_ids)
+        ).values_list('project_id', flat=True).distinct()
+        for project_id in project_ids:
+            response_cache.invalidate(project_id)
+
+
+pending_deletes = PendingDeletes()
+
+
+@receiver(post_delete, sender=Subtask)
+def invalidate_after_subtask_delete(sender, instance, **kwargs):
+    if Subtask.phase.field.is_cached(instance):
+        _invalidate_on_commit(instance.phase.project_id)
+        return
+    pending_deletes.phase_ids.add(instance.phase_id)
+    transaction.on_commit(pending_deletes.flush)
+
+
+@receiver(post_delete, sender=SubtaskFieldWorker)
+def invalidate_after_assignment_delete(sender, instance, **kwargs):
+    # A subtask deleted in the same transaction is covered by its own
+    # receiver, since the lookup below runs after it is gone
+    pending_deletes.subtask_ids.add(instance.subtask_id)
+    transaction.on_commit(pending_deletes.flush)
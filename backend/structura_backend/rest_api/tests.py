@@ -1,3 +1,1169 @@
-from django.test import TestCase
+import csv
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.test import APIClient, APIRequestFactory
+
+from app import models
+from .authentication import SignedTokenAuthentication, issue_token, token_cache, verify_token
+
+
+def make_project(email='pm@structura.com'):
+    user = models.User.objects.create(
+        email=email,
+        password_hash='secret123',
+        first_name='Project',
+        last_name='Manager',
+    )
+    return models.Project.objects.create(
+        project_name='Warehouse',
+        user=user,
+        project_type='Commercial',
+        start_date=datetime.date(2025, 1, 6),
+        budget=1000000,
+        status='In Progress',
+    )
+
+
+def make_phases(project, phase_count, subtasks_per_phase, workers):
+    for _ in range(phase_count):
+        phase = models.Phase.objects.create(
+            project=project,
+            phase_name='PHASE 4 - Construction Phase',
+        )
+        for index in range(subtasks_per_phase):
+            subtask = models.Subtask.objects.create(phase=phase, title=f'Task {index}')
+            for worker in workers:
+                models.SubtaskFieldWorker.objects.create(subtask=subtask, field_worker=worker)
+
+
+def make_workers(project, count):
+    return [
+        models.FieldWorker.objects.create(
+            project_id=project,
+            first_name='Worker',
+            last_name=str(index),
+            phone_number='09170000000',
+        )
+        for index in range(count)
+    ]
+
+
+class PhaseQueryCountTests(TestCase):
+    """Listing phases and subtasks must not issue a query per row."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.project = make_project()
+        self.workers = make_workers(self.project, 3)
+
+    def test_phase_list_query_count_is_constant(self):
+        make_phases(self.project, 1, 1, self.workers[:1])
+        # phases, subtasks, assignments joined with workers
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/phases/?project_id={self.project.project_id}')
+        self.assertEqual(len(response.json()), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_phases(self.project, 6, 5, self.workers)
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/phases/?project_id={self.project.project_id}')
+        phases = response.json()
+        self.assertEqual(len(phases), 7)
+        self.assertEqual(len(phases[-1]['subtasks']), 5)
+        self.assertEqual(len(phases[-1]['subtasks'][0]['assigned_workers']), 3)
+
+    def test_subtask_list_query_count_is_constant(self):
+        make_phases(self.project, 1, 2, self.workers[:1])
+        phase = models.Phase.objects.get()
+        with self.assertNumQueries(2):
+            self.client.get(f'/api/subtasks/?phase_id={phase.phase_id}')
+
+        for index in range(10):
+            subtask = models.Subtask.objects.create(phase=phase, title=f'Extra {index}')
+            for worker in self.workers:
+                models.SubtaskFieldWorker.objects.create(subtask=subtask, field_worker=worker)
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/subtasks/?phase_id={phase.phase_id}')
+        self.assertEqual(len(response.json()), 12)
+
+    def test_project_tree_query_count_is_constant(self):
+        make_phases(self.project, 1, 1, self.workers[:1])
+        # project, phases, subtasks, assignments, field workers
+        with self.assertNumQueries(5):
+            self.client.get(f'/api/projects/{self.project.project_id}/tree/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_phases(self.project, 6, 5, self.workers)
+        with self.assertNumQueries(5):
+            response = self.client.get(f'/api/projects/{self.project.project_id}/tree/')
+        summary = response.json()['summary']
+        self.assertEqual(summary['total_phases'], 7)
+        self.assertEqual(summary['total_subtasks'], 31)
+        self.assertEqual(summary['assigned_field_workers'], 3)
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.project = make_project()
+        workers = make_workers(self.project, 3)
+        start = datetime.date(2025, 3, 1)
+        for day in range(4):
+            for worker in workers:
+                models.Attendance.objects.create(
+                    field_worker=worker,
+                    project=self.project,
+                    attendance_date=start + datetime.timedelta(days=day),
+                    status='on_site',
+                )
+        self.url = f'/api/attendance/?project_id={self.project.project_id}'
+
+    def test_unpaginated_without_cursor_params(self):
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 12)
+
+    def test_walks_every_row_forward_and_back(self):
+        seen = []
+        url = f'{self.url}&page_size=5'
+        pages = []
+        while url:
+            page = self.client.get(url).json()
+            pages.append(page)
+            seen.extend(row['attendance_id'] for row in page['results'])
+            url = page['next']
+        expected = list(
+            models.Attendance.objects.order_by('-attendance_date', '-attendance_id')
+            .values_list('attendance_id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(page['results']) for page in pages], [5, 5, 2])
+        self.assertIsNone(pages[0]['previous'])
+
+        previous = self.client.get(pages[-1]['previous']).json()
+        self.assertEqual(previous['results'], pages[1]['results'])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(f'{self.url}&cursor=garbage')
+        self.assertEqual(response.status_code, 404)
+
+
+class AttendanceBulkUpsertTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.project = make_project()
+        self.workers = make_workers(self.project, 3)
+        self.url = '/api/attendance/bulk/'
+
+    def test_creates_then_updates_without_clearing_omitted_fields(self):
+        records = [
+            {
+                'field_worker': worker.fieldworker_id,
+                'attendance_date': '2025-03-03',
+                'check_in_time': '07:00',
+                'status': 'on_site',
+            }
+            for worker in self.workers
+        ]
+        response = self.client.post(
+            self.url, {'project': self.project.project_id, 'records': records}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 3)
+
+        checkout = [
+            {
+                'field_worker': self.workers[0].fieldworker_id,
+                'attendance_date': '2025-03-03',
+                'check_out_time': '16:00',
+            }
+        ]
+        response = self.client.post(
+            self.url, {'project': self.project.project_id, 'records': checkout}, format='json'
+        )
+        self.assertEqual(response.json()['updated'], 1)
+        attendance = models.Attendance.objects.get(field_worker=self.workers[0])
+        self.assertEqual(str(attendance.check_in_time), '07:00:00')
+        self.assertEqual(str(attendance.check_out_time), '16:00:00')
+        self.assertEqual(attendance.status, 'on_site')
+        self.assertEqual(attendance.worked_minutes, 9 * 60)
+        self.assertEqual(models.Attendance.objects.count(), 3)
+
+    def test_reports_row_errors_and_applies_valid_rows(self):
+        other_project = make_project(email='other@structura.com')
+        outsider = make_workers(other_project, 1)[0]
+        records = [
+            {'field_worker': self.workers[0].fieldworker_id, 'attendance_date': '2025-03-03'},
+            {'field_worker': self.workers[0].fieldworker_id, 'attendance_date': '2025-03-03'},
+            {'field_worker': outsider.fieldworker_id, 'attendance_date': '2025-03-03'},
+            {'field_worker': self.workers[1].fieldworker_id, 'attendance_date': 'not-a-date'},
+        ]
+        response = self.client.post(
+            self.url, {'project': self.project.project_id, 'records': records}, format='json'
+        )
+        body = response.json()
+        self.assertEqual([row['status'] for row in body['results']], ['created', 'error', 'error', 'error'])
+        self.assertEqual(models.Attendance.objects.count(), 1)
+
+
+class AttendanceMinutesTests(TestCase):
+
+    def setUp(self):
+        self.project = make_project()
+        self.worker = make_workers(self.project, 1)[0]
+
+    def test_save_maintains_worked_and_break_minutes(self):
+        attendance = models.Attendance.objects.create(
+            field_worker=self.worker, project=self.project, attendance_date=datetime.date(2025, 3, 3),
+            check_in_time=datetime.time(7, 30), break_in_time=datetime.time(12), status='on_site',
+        )
+        self.assertEqual((attendance.worked_minutes, attendance.break_minutes), (0, 0))
+
+        attendance.break_out_time = datetime.time(12, 45)
+        attendance.check_out_time = datetime.time(16, 30)
+        attendance.save(update_fields=['break_out_time', 'check_out_time'])
+        attendance.refresh_from_db()
+        self.assertEqual((attendance.worked_minutes, attendance.break_minutes), (8 * 60 + 15, 45))
+
+    def test_backfill_repairs_rows_written_without_save(self):
+        attendance = models.Attendance.objects.create(
+            field_worker=self.worker, project=self.project, attendance_date=datetime.date(2025, 3, 3),
+            check_in_time=datetime.time(8), check_out_time=datetime.time(17), status='on_site',
+        )
+        models.Attendance.objects.filter(pk=attendance.pk).update(check_out_time=datetime.time(12))
+
+        call_command('backfill_attendance_minutes', stdout=io.StringIO())
+        attendance.refresh_from_db()
+        self.assertEqual(attendance.worked_minutes, 4 * 60)
+
+
+class PhaseNestedSubtaskUpdateTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.project = make_project()
+        self.workers = make_workers(self.project, 2)
+        make_phases(self.project, 1, 3, self.workers)
+        self.phase = models.Phase.objects.get()
+        self.subtasks = list(self.phase.subtasks.all())
+
+    def test_update_keeps_ids_and_assignments(self):
+        kept, changed, removed = self.subtasks
+        payload = {
+            'subtasks': [
+                {'subtask_id': kept.subtask_id, 'title': kept.title},
+                {'subtask_id': changed.subtask_id, 'title': 'Pour slab', 'status': 'completed'},
+                {'title': 'Cure slab'},
+            ]
+        }
+        response = self.client.patch(f'/api/phases/{self.phase.phase_id}/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        titles = {subtask.subtask_id: subtask.title for subtask in self.phase.subtasks.all()}
+        self.assertEqual(titles[kept.subtask_id], kept.title)
+        self.assertEqual(titles[changed.subtask_id], 'Pour slab')
+        self.assertNotIn(removed.subtask_id, titles)
+        self.assertIn('Cure slab', titles.values())
+        self.assertEqual(
+            models.SubtaskFieldWorker.objects.filter(
+                subtask__in=[kept.subtask_id, changed.subtask_id]
+            ).count(),
+            4,
+        )
+
+    def test_rejects_subtask_from_another_phase(self):
+        make_phases(self.project, 1, 1, [])
+        foreign = models.Subtask.objects.exclude(phase=self.phase).get()
+        payload = {'subtasks': [{'subtask_id': foreign.subtask_id, 'title': 'Hijack'}]}
+        response = self.client.patch(f'/api/phases/{self.phase.phase_id}/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(models.Subtask.objects.get(pk=foreign.pk).title, 'Task 0')
+
+    def test_rejects_duplicate_subtask_ids_as_duplicates(self):
+        subtask = self.phase.subtasks.first()
+        payload = {'subtasks': [{'subtask_id': subtask.subtask_id}, {'subtask_id': subtask.subtask_id}]}
+        response = self.client.patch(f'/api/phases/{self.phase.phase_id}/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['subtasks'], [f'Subtask {subtask.subtask_id} is listed more than once'])
+
+
+class ProgressCounterTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.project = make_project()
+        make_phases(self.project, 2, 3, [])
+        self.phase, self.other_phase = models.Phase.objects.order_by('phase_id')
+
+    def counters(self):
+        project = models.Project.objects.get(pk=self.project.pk)
+        phase = models.Phase.objects.get(pk=self.phase.pk)
+        return (
+            [getattr(project, field) for field in models.Project.PROGRESS_FIELDS],
+            [phase.total_subtasks, phase.completed_subtasks],
+        )
+
+    def test_counters_follow_subtask_and_phase_writes(self):
+        self.assertEqual(self.counters(), ([2, 0, 6, 0], [3, 0]))
+
+        subtask = self.phase.subtasks.first()
+        self.client.patch(f'/api/subtasks/{subtask.pk}/', {'status': 'completed'}, format='json')
+        self.assertEqual(self.counters(), ([2, 0, 6, 1], [3, 1]))
+
+        kept = list(self.phase.subtasks.order_by('subtask_id').values_list('subtask_id', flat=True))
+        payload = {
+            'status': 'completed',
+            'subtasks': [
+                {'subtask_id': kept[0], 'status': 'pending'},
+                {'subtask_id': kept[1], 'status': 'completed'},
+                {'title': 'Punch list', 'status': 'completed'},
+                {'title': 'Cleanup'},
+            ],
+        }
+        response = self.client.patch(f'/api/phases/{self.phase.pk}/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['completed_subtasks'], 2)
+        self.assertEqual(self.counters(), ([2, 1, 7, 2], [4, 2]))
+
+        self.other_phase.delete()
+        self.assertEqual(self.counters(), ([1, 1, 4, 2], [4, 2]))
+
+    def test_deletes_are_counted_once_per_statement(self):
+        subtasks = list(self.phase.subtasks.order_by('subtask_id'))
+        models.Subtask.objects.filter(pk=subtasks[0].pk).update(status='completed')
+        call_command('rebuild_progress_counters', stdout=io.StringIO())
+
+        payload = {'subtasks': [{'subtask_id': subtasks[2].pk}]}
+        self.client.patch(f'/api/phases/{self.phase.pk}/', payload, format='json')
+        self.assertEqual(self.counters(), ([2, 0, 4, 0], [1, 0]))
+
+        self.client.delete(f'/api/subtasks/{subtasks[2].pk}/')
+        self.assertEqual(self.counters(), ([2, 0, 3, 0], [0, 0]))
+
+        # The phase cascade deletes its subtasks with two statements, not per row
+        with CaptureQueriesContext(connection) as queries:
+            self.client.delete(f'/api/phases/{self.other_phase.pk}/')
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.counters(), ([1, 0, 0, 0], [0, 0]))
+
+    def test_phase_edit_query_count_does_not_grow_with_removed_subtasks(self):
+        def removal_queries(phase, keep):
+            subtasks = list(phase.subtasks.order_by('subtask_id').values_list('subtask_id', flat=True))
+            payload = {'subtasks': [{'subtask_id': pk} for pk in subtasks[:keep]]}
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.patch(f'/api/phases/{phase.pk}/', payload, format='json')
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        for index in range(27):
+            models.Subtask.objects.create(phase=self.other_phase, title=f'Extra {index}')
+        self.assertEqual(removal_queries(self.phase, 1), removal_queries(self.other_phase, 1))
+        self.assertEqual(self.counters()[0], [2, 0, 2, 0])
+
+    def test_rebuild_command_repairs_drift(self):
+        models.Subtask.objects.update(status='completed')
+        call_command('rebuild_progress_counters', stdout=io.StringIO())
+        self.assertEqual(self.counters(), ([2, 0, 6, 6], [3, 3]))
+
+
+class TokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.project = make_project()
+        token_cache.clear()
+
+    def test_login_token_authenticates_without_queries(self):
+        response = self.client.post(
+            '/api/login/',
+            {'email': 'pm@structura.com', 'password': 'secret123'},
+            format='json',
+        )
+        token = response.json()['token']
+
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        with self.assertNumQueries(0):
+            principal, _ = SignedTokenAuthentication().authenticate(request)
+        self.assertEqual(principal.type, 'user')
+        self.assertEqual(principal.id, self.project.user.user_id)
+        self.assertIs(verify_token(token), principal)
+
+    def test_tampered_token_is_rejected(self):
+        token = issue_token('user', 1)
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}x')
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            SignedTokenAuthentication().authenticate(request)
+
+    @override_settings(AUTH_TOKEN_MAX_AGE=-1)
+    def test_stale_tokens_are_anonymous_on_open_routes(self):
+        token = issue_token('user', self.project.user.user_id)
+        response = self.client.get('/api/regions/', HTTP_AUTHORIZATION=f'Bearer {token}x')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(
+            '/api/login/',
+            {'email': 'pm@structura.com', 'password': 'secret123'},
+            format='json',
+            HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+
+
+class LoginDirectoryTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.project = make_project()
+
+    def login(self, email, password):
+        return self.client.post('/api/login/', {'email': email, 'password': password}, format='json')
+
+    def test_supervisor_login_is_one_query_and_tracks_project(self):
+        supervisor = models.Supervisors.objects.create(
+            first_name='Site',
+            last_name='Boss',
+            email='boss@structura.com',
+            password_hash='boss-pass',
+            phone_number='09170000000',
+        )
+        supervisor.project_id = self.project
+        supervisor.save()
+
+        with self.assertNumQueries(1):
+            response = self.login('boss@structura.com', 'boss-pass')
+        user = response.json()['user']
+        self.assertEqual(user['type'], 'Supervisor')
+        self.assertEqual(user['project_id'], self.project.project_id)
+
+        self.project.delete()
+        self.assertIsNone(self.login('boss@structura.com', 'boss-pass').json()['user']['project_id'])
+
+    def test_user_row_takes_precedence_over_client(self):
+        self.client.post('/api/clients/', {
+            'first_name': 'Owner',
+            'last_name': 'Client',
+            'email': 'owner@structura.com',
+            'password_hash': 'owner-pass',
+            'phone_number': '09170000000',
+        }, format='json')
+        user = self.login('owner@structura.com', 'owner-pass').json()['user']
+        self.assertEqual(user['type'], 'user')
+        self.assertEqual(user['role'], 'Client')
+
+    def test_deleted_account_cannot_login(self):
+        self.project.user.delete()
+        self.assertEqual(self.login('pm@structura.com', 'secret123').status_code, 404)
+
+
+class AddressTreeTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        region = models.Region.objects.create(code='11', name='Davao Region')
+        province = models.Province.objects.create(code='1124', name='Davao del Sur', region=region)
+        city = models.City.objects.create(code='112402', name='Davao City', province=province)
+        models.Barangay.objects.create(code='112402001', name='Agdao', city=city)
+        models.Region.objects.create(code='07', name='Central Visayas')
+        self.region = region
+
+    def test_etag_revalidation_is_a_304_without_queries(self):
+        response = self.client.get('/api/address-tree/')
+        document = json.loads(response.content)
+        self.assertEqual(len(document['regions']), 2)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/address-tree/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_region_subtree_is_gzipped_and_invalidated_on_change(self):
+        url = f'/api/address-tree/?region={self.region.pk}'
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        document = json.loads(gzip.decompress(response.content))
+        self.assertEqual(
+            document['regions'][0]['provinces'][0]['cities'][0]['barangays'][0]['name'], 'Agdao'
+        )
+
+        models.Barangay.objects.create(code='112402002', name='Bago Aplaya', city=models.City.objects.get())
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+
+class RequestLoggingTests(TestCase):
+
+    def test_logs_route_queries_and_principal(self):
+        project = make_project()
+        token = issue_token('user', project.user.user_id)
+        with self.assertLogs('rest_api.requests', level='INFO') as logs:
+            self.client.get(
+                f'/api/phases/?project_id={project.project_id}',
+                HTTP_AUTHORIZATION=f'Bearer {token}',
+            )
+        fields = logs.records[-1].fields
+        self.assertEqual(fields['status'], 200)
+        self.assertEqual(fields['view'], 'phase-list')
+        self.assertEqual(fields['queries'], 1)
+        self.assertEqual(fields['principal'], f'user:{project.user.user_id}')
+
+    def test_streamed_queries_are_not_reported_as_zero(self):
+        project = make_project()
+        with self.assertLogs('rest_api.requests', level='INFO') as logs:
+            response = self.client.get(f'/api/field-workers/export/?project_id={project.project_id}')
+            b''.join(response.streaming_content)
+        self.assertIsNone(logs.records[-1].fields['queries'])
+
+
+class DashboardTests(TransactionTestCase):
+    """Dashboard reads run on worker threads, so data must be committed."""
+
+    def setUp(self):
+        self.project = make_project()
+        workers = make_workers(self.project, 3)
+        make_phases(self.project, 2, 2, workers[:1])
+        models.Phase.objects.filter(pk=models.Phase.objects.first().pk).update(status='in_progress')
+        for worker, attendance_status in zip(workers, ['on_site', 'on_site', 'absent']):
+            models.Attendance.objects.create(
+                field_worker=worker,
+                project=self.project,
+                attendance_date=timezone.localdate(),
+                status=attendance_status,
+            )
+
+    def test_manager_dashboard(self):
+        with self.assertLogs('rest_api.requests', level='INFO') as logs:
+            response = self.client.get(f'/api/dashboard/?user_id={self.project.user_id}')
+        # Reads on the worker threads are counted towards the request
+        self.assertGreater(logs.records[-1].fields['queries'], 0)
+        data = response.json()
+        self.assertEqual(data['total_projects'], 1)
+        self.assertEqual(data['attendance_today'], {'on_site': 2, 'absent': 1})
+        self.assertEqual(len(data['phases_in_progress']), 1)
+        self.assertEqual(data['workers_by_role'], {'Mason': 3})
+
+    def test_project_dashboard(self):
+        response = self.client.get(f'/api/dashboard/projects/{self.project.project_id}/')
+        data = response.json()
+        self.assertEqual(data['project']['project_name'], 'Warehouse')
+        self.assertEqual(data['subtasks_by_status'], {'pending': 4})
+        self.assertEqual(self.client.get('/api/dashboard/projects/999/').status_code, 404)
+
+
+class PayrollTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.project = make_project()
+        self.worker = make_workers(self.project, 1)[0]
+        self.worker.payrate = 800
+        self.worker.save()
+        day = datetime.date(2025, 3, 3)
+        # 07:00-17:00 with a one hour break: 9 hours, one of them overtime
+        models.Attendance.objects.create(
+            field_worker=self.worker, project=self.project, attendance_date=day,
+            check_in_time=datetime.time(7), check_out_time=datetime.time(17),
+            break_in_time=datetime.time(12), break_out_time=datetime.time(13), status='on_site',
+        )
+        # 08:00-12:00 without a break: 4 hours
+        models.Attendance.objects.create(
+            field_worker=self.worker, project=self.project, attendance_date=day + datetime.timedelta(days=1),
+            check_in_time=datetime.time(8), check_out_time=datetime.time(12), status='on_site',
+        )
+        self.params = {'project': self.project.project_id, 'start_date': '2025-03-01', 'end_date': '2025-03-31'}
+
+    def test_computes_hours_and_pay(self):
+        entry = self.client.get('/api/payroll/', self.params).json()['entries'][0]
+        self.assertEqual(entry['days_worked'], 2)
+        self.assertEqual(entry['worked_hours'], '13.00')
+        self.assertEqual(entry['overtime_hours'], '1.00')
+        # 12 regular hours at 100/hour plus 1 overtime hour at 125
+        self.assertEqual(entry['gross_pay'], '1325.00')
+
+    def test_finalized_period_is_served_from_snapshot(self):
+        response = self.client.post('/api/payroll/finalize/', self.params, format='json')
+        self.assertEqual(response.status_code, 201)
+        models.Attendance.objects.all().delete()
+
+        data = self.client.get('/api/payroll/', self.params).json()
+        self.assertTrue(data['finalized'])
+        self.assertEqual(data['total_gross_pay'], '1325.00')
+        self.assertEqual(self.client.post('/api/payroll/finalize/', self.params, format='json').status_code, 400)
+
+    def test_concurrent_finalize_is_rejected_not_a_server_error(self):
+        self.client.post('/api/payroll/finalize/', self.params, format='json')
+        # The other request passed the existence check before this one committed
+        with mock.patch('django.db.models.query.QuerySet.exists', return_value=False):
+            response = self.client.post('/api/payroll/finalize/', self.params, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(models.PayrollPeriod.objects.count(), 1)
+
+    def test_pay_is_exact_to_the_centavo(self):
+        self.worker.payrate = Decimal('333.33')
+        self.worker.save()
+        entry = self.client.get('/api/payroll/', self.params).json()['entries'][0]
+        # 720 regular minutes: 333.33 * 720 / 480 = 499.995 -> 500.00
+        self.assertEqual(entry['regular_pay'], '500.00')
+        # 60 overtime minutes: 333.33 * 60 * 1.25 / 480 = 52.0828... -> 52.08
+        self.assertEqual(entry['overtime_pay'], '52.08')
+        self.assertEqual(entry['gross_pay'], '552.08')
+
+
+class ReportTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.project = make_project()
+        self.workers = make_workers(self.project, 2)
+        for worker in self.workers:
+            worker.payrate = 800
+            worker.save()
+        self.day = datetime.date(2025, 3, 3)
+        # 07:00-17:00 with a one hour break: 9 hours, one of them overtime
+        models.Attendance.objects.create(
+            field_worker=self.workers[0], project=self.project, attendance_date=self.day,
+            check_in_time=datetime.time(7), check_out_time=datetime.time(17),
+            break_in_time=datetime.time(12), break_out_time=datetime.time(13), status='on_site',
+        )
+        models.Attendance.objects.create(
+            field_worker=self.workers[1], project=self.project, attendance_date=self.day, status='absent',
+        )
+        self.params = {'project': self.project.project_id, 'start_date': '2025-03-01', 'end_date': '2025-03-31'}
+
+    def test_reports_aggregate_in_the_database(self):
+        data = self.client.get('/api/reports/', self.params).json()
+        self.assertEqual(data['attendance']['days'], [{
+            'date': '2025-03-03', 'present': 1, 'absent': 1, 'attendance_rate': 0.5, 'worked_hours': 9.0,
+        }])
+        self.assertEqual(data['workforce']['headcount'], 2)
+        self.assertEqual(data['progress']['total_phases'], 0)
+        # 8 regular hours at 100/hour plus 1 overtime hour at 125, same as payroll
+        self.assertEqual(data['budget']['labor_cost'], '925.00')
+        self.assertEqual(data['budget']['remaining'], '999075.00')
+
+    def test_budget_labor_cost_matches_payroll(self):
+        self.workers[0].payrate = Decimal('333.33')
+        self.workers[0].save()
+        models.Attendance.objects.create(
+            field_worker=self.workers[0], project=self.project, attendance_date=self.day + datetime.timedelta(days=1),
+            check_in_time=datetime.time(8), check_out_time=datetime.time(12), status='on_site',
+        )
+        budget = self.client.get('/api/reports/budget/', self.params).json()['budget']
+        payroll = self.client.get('/api/payroll/', self.params).json()
+        self.assertEqual(Decimal(budget['labor_cost']), Decimal(str(payroll['total_gross_pay'])))
+        self.assertEqual(budget['labor_cost'], '552.08')
+
+    def test_results_are_cached_until_attendance_changes(self):
+        self.client.get('/api/reports/attendance/', self.params)
+        with self.assertNumQueries(1):  # the project lookup during validation
+            self.client.get('/api/reports/attendance/', self.params)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Attendance.objects.filter(field_worker=self.workers[1]).get().delete()
+        data = self.client.get('/api/reports/attendance/', self.params).json()
+        self.assertEqual(data['attendance']['days'][0]['absent'], 0)
+
+
+class CsvExportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.project = make_project()
+        self.workers = make_workers(self.project, 3)
+        for offset in range(4):
+            for worker in self.workers:
+                models.Attendance.objects.create(
+                    field_worker=worker, project=self.project,
+                    attendance_date=datetime.date(2025, 3, 3) + datetime.timedelta(days=offset),
+                    check_in_time=datetime.time(8), check_out_time=datetime.time(12), status='on_site',
+                )
+
+    def read_csv(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        return list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_attendance_export_streams_the_date_range(self):
+        response = self.client.get('/api/attendance/export/', {
+            'project_id': self.project.project_id, 'start_date': '2025-03-04', 'end_date': '2025-03-05',
+        })
+        rows = self.read_csv(response)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['attendance_date'], '2025-03-04')
+        self.assertEqual(rows[0]['worked_minutes'], '240')
+        self.assertEqual(rows[0]['break_in_time'], '')
+
+    def test_roster_export_requires_a_project(self):
+        self.assertEqual(self.client.get('/api/field-workers/export/').status_code, 400)
+        rows = self.read_csv(self.client.get('/api/field-workers/export/', {'project_id': self.project.project_id}))
+        self.assertEqual([row['last_name'] for row in rows], ['0', '1', '2'])
+
+
+class FieldWorkerImportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.project = make_project()
+        self.existing = make_workers(self.project, 1)[0]
+        self.existing.sss_id = '34-1234567-8'
+        self.existing.save()
+        self.url = f'/api/field-workers/import/?project_id={self.project.project_id}'
+
+    def test_csv_import_reports_each_row(self):
+        upload = io.BytesIO(
+            b'first_name,last_name,phone_number,role,sss_id,payrate\n'
+            b'Ana,Cruz,09171111111,Mason,34-0000001-1,650\n'
+            b'Jose,Reyes,09172222222,Painter,34-1234567-8,600\n'
+            b'Rosa,Santos,09173333333,Carpenter,,\n'
+            b',Garcia,09174444444,Mason,,\n'
+        )
+        upload.name = 'crew.csv'
+        # project, one ID lookup, and the insert wrapped in a savepoint
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['created'], data['failed']), (2, 2))
+        self.assertEqual([result['status'] for result in data['results']], ['created', 'error', 'created', 'error'])
+        self.assertIn('sss_id', data['results'][1]['errors'])
+        self.assertIn('first_name', data['results'][3]['errors'])
+        self.assertEqual(models.FieldWorker.objects.filter(project_id=self.project).count(), 3)
+
+    def test_json_dry_run_flags_duplicates_within_the_upload(self):
+        workers = [
+            {'first_name': 'Ana', 'last_name': 'Cruz', 'phone_number': '0917', 'pagibig_id': '1211'},
+            {'first_name': 'Joy', 'last_name': 'Cruz', 'phone_number': '0917', 'pagibig_id': '1211'},
+        ]
+        response = self.client.post(self.url, {'workers': workers, 'dry_run': True}, format='json')
+        results = response.json()['results']
+        self.assertEqual(results[0]['status'], 'valid')
+        self.assertEqual(results[1]['errors'], {'pagibig_id': ['Duplicate ID in this import']})
+        self.assertEqual(models.FieldWorker.objects.count(), 1)
+
+
+class WorkerReassignTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.source = make_project()
+        self.target = make_project('pm2@structura.com')
+        self.workers = make_workers(self.source, 3)
+        self.workers[0].role = 'Painter'
+        self.workers[0].save()
+        make_phases(self.source, 1, 2, self.workers)
+
+    def test_moves_crew_and_drops_stale_assignments_in_constant_queries(self):
+        payload = {'from_project': self.source.project_id, 'to_project': self.target.project_id, 'role': 'Mason'}
+        # two project lookups, then lock, assignment SELECT (for the delete
+        # signals), DELETE and UPDATE in a savepoint
+        with self.assertNumQueries(8):
+            response = self.client.post('/api/field-workers/reassign/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['moved'], 2)
+        self.assertEqual(response.json()['assignments_removed'], 4)
+        self.assertEqual(models.FieldWorker.objects.filter(project_id=self.target).count(), 2)
+        self.assertEqual(
+            set(models.SubtaskFieldWorker.objects.values_list('field_worker', flat=True)),
+            {self.workers[0].pk},
+        )
+
+    def test_command_dry_run_changes_nothing(self):
+        out = io.StringIO()
+        call_command(
+            'reassign_workers', '--from', str(self.source.pk), '--to', str(self.target.pk), '--dry-run', stdout=out,
+        )
+        self.assertIn('Would move 3 workers', out.getvalue())
+        self.assertEqual(models.FieldWorker.objects.filter(project_id=self.source).count(), 3)
+
+
+class MediaUploadTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.project = make_project()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def image_upload(self, size=(1200, 900)):
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.new('RGB', size, 'orange').save(buffer, 'PNG')
+        buffer.seek(0)
+        buffer.name = 'site.png'
+        return buffer
+
+    def test_upload_stores_key_and_serves_immutable_thumbnails(self):
+        response = self.client.post('/api/media/', {'file': self.image_upload(), 'project': self.project.pk})
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data['width'], data['height']), (1200, 900))
+
+        project = self.client.get(f'/api/projects/{self.project.pk}/').json()
+        self.assertEqual(project['project_image'], data['key'])
+        self.assertEqual(project['project_image_thumbnail'], data['urls']['small'])
+
+        response = self.client.get(data['urls']['small'])
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', response['Cache-Control'])
+        from PIL import Image
+        self.assertEqual(Image.open(io.BytesIO(b''.join(response.streaming_content))).size, (160, 160))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(data['urls']['small'], HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_keys_are_not_found_even_with_a_matching_etag(self):
+        self.assertEqual(self.client.get('/api/media/not-a-key/small/').status_code, 404)
+        key = 'ab' * 10
+        response = self.client.get(f'/api/media/{key}/small/', HTTP_IF_NONE_MATCH=f'"{key}-small"')
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_files_are_not_found(self):
+        response = self.client.post('/api/media/', {'file': self.image_upload()})
+        urls = response.json()['urls']
+        shutil.rmtree(self.media_root)
+        self.assertEqual(self.client.get(urls['original']).status_code, 404)
+        self.assertEqual(self.client.get(urls['small']).status_code, 404)
+
+    def test_rejects_files_that_are_not_images(self):
+        upload = io.BytesIO(b'#!/bin/sh\necho hi\n')
+        upload.name = 'photo.jpg'
+        response = self.client.post('/api/media/', {'file': upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(models.MediaAsset.objects.exists())
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.project = make_project()
+        make_phases(self.project, 2, 2, [])
+        self.url = f'/api/phases/?project_id={self.project.project_id}'
+
+    def test_cached_until_a_subtask_write_commits(self):
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+        subtask = models.Subtask.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/subtasks/{subtask.pk}/', {'status': 'completed'}, format='json')
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        statuses = [item['status'] for phase in response.json() for item in phase['subtasks']]
+        self.assertIn('completed', statuses)
+
+    def test_serves_stale_copy_while_another_request_rebuilds(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Phase.objects.first().save()
+        # Simulate a rebuild already in progress in another worker
+        query = hashlib.sha1(f'project_id={self.project.project_id}'.encode()).hexdigest()[:16]
+        cache.add(f'rest_api:response:phase-list:{self.project.project_id}:{query}:rebuilding', 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'STALE')
+
+    def test_assignment_delete_invalidates_its_project(self):
+        worker = make_workers(self.project, 1)[0]
+        assignment = models.SubtaskFieldWorker.objects.create(
+            subtask=models.Subtask.objects.first(), field_worker=worker
+        )
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/subtask-assignments/{assignment.pk}/')
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+    def test_queryset_deletes_outside_the_views_invalidate(self):
+        worker = make_workers(self.project, 1)[0]
+        for subtask in models.Subtask.objects.all():
+            models.SubtaskFieldWorker.objects.create(subtask=subtask, field_worker=worker)
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            models.SubtaskFieldWorker.objects.filter(field_worker=worker).delete()
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Subtask.objects.filter(phase__project=self.project).delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([phase['subtasks'] for phase in response.json()], [[], []])
+
+    def test_moving_a_worker_invalidates_both_projects(self):
+        other = make_project('pm2@structura.com')
+        worker = make_workers(self.project, 1)[0]
+        other_url = f'/api/projects/{other.project_id}/'
+        self.client.get(self.url)
+        self.client.get(other_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/field-workers/{worker.pk}/', {'project_id': other.project_id}, format='json')
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(other_url)['X-Cache'], 'MISS')
+
+    def test_other_projects_are_not_invalidated(self):
+        other = make_project('pm2@structura.com')
+        other_url = f'/api/projects/{other.project_id}/'
+        self.client.get(other_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Subtask.objects.first().delete()
+        self.assertEqual(self.client.get(other_url)['X-Cache'], 'HIT')
+
+
+class SparseFieldsetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.project = make_project()
+        self.workers = make_workers(self.project, 3)
+
+    def test_fields_trims_payload_and_columns(self):
+        url = f'/api/projects/?user_id={self.project.user_id}&fields=project_id,project_name,status'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(list(response.json()[0]), ['project_id', 'project_name', 'status'])
+        sql = queries.captured_queries[0]['sql']
+        self.assertNotIn('description', sql)
+        self.assertNotIn('app_region', sql)
+
+    def test_omit_drops_fields(self):
+        response = self.client.get(
+            f'/api/field-workers/?project_id={self.project.project_id}&omit=sss_id,philhealth_id,pagibig_id,payrate'
+        )
+        worker = response.json()[0]
+        self.assertIn('first_name', worker)
+        for field in ('sss_id', 'philhealth_id', 'pagibig_id', 'payrate'):
+            self.assertNotIn(field, worker)
+
+    def test_phase_fields_without_subtasks_skip_the_prefetch(self):
+        make_phases(self.project, 2, 3, self.workers)
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                f'/api/phases/?project_id={self.project.project_id}&fields=phase_id,phase_name'
+            )
+        self.assertEqual(response.json()[0], {
+            'phase_id': response.json()[0]['phase_id'],
+            'phase_name': 'PHASE 4 - Construction Phase',
+        })
+
+    def test_attendance_names_are_joined(self):
+        for worker in self.workers:
+            models.Attendance.objects.create(
+                field_worker=worker, project=self.project, attendance_date=datetime.date(2025, 3, 3)
+            )
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/attendance/?project_id={self.project.project_id}')
+        self.assertEqual({row['field_worker_name'] for row in response.json()}, {'Worker 0', 'Worker 1', 'Worker 2'})
+
+    def test_writes_ignore_fields(self):
+        worker = self.workers[0]
+        response = self.client.patch(
+            f'/api/field-workers/{worker.pk}/?fields=first_name', {'payrate': '650.00'}, format='json'
+        )
+        self.assertEqual(response.json()['payrate'], '650.00')
+        self.assertIn('last_name', response.json())
+        worker.refresh_from_db()
+        self.assertEqual(worker.last_name, '0')
+
+
+    def test_deletes_load_no_relations(self):
+        make_phases(self.project, 1, 3, self.workers)
+        phase = models.Phase.objects.get()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(f'/api/phases/{phase.pk}/')
+        self.assertEqual(response.status_code, 204)
+        lookup = queries.captured_queries[0]['sql']
+        self.assertIn('FROM "app_phase"', lookup)
+        self.assertNotIn('JOIN', lookup)
+        self.assertFalse(any('app_fieldworker' in query['sql'] for query in queries.captured_queries))
+
+
+class ProjectListTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.project = make_project()
+        region = models.Region.objects.create(code='03', name='Central Luzon')
+        province = models.Province.objects.create(code='0314', name='Bulacan', region=region)
+        city = models.City.objects.create(code='031410', name='Malolos', province=province)
+        barangay = models.Barangay.objects.create(code='031410001', name='Atlag', city=city)
+        for index in range(5):
+            models.Project.objects.create(
+                project_name=f'Site {index}',
+                user=self.project.user,
+                project_type='Commercial',
+                start_date=datetime.date(2025, 1, 6),
+                budget=1000000,
+                region=region,
+                province=province,
+                city=city,
+                barangay=barangay,
+            )
+
+    def test_list_is_one_query_and_compact(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/projects/?user_id={self.project.user_id}')
+        projects = response.json()
+        self.assertEqual(len(projects), 6)
+        self.assertEqual(projects[0]['city_name'], 'Malolos')
+        self.assertEqual(projects[0]['region_name'], 'Central Luzon')
+        self.assertNotIn('description', projects[0])
+        self.assertNotIn('supervisor', projects[0])
+
+    def test_detail_is_full_and_joined(self):
+        project = models.Project.objects.exclude(pk=self.project.pk).first()
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/projects/{project.pk}/')
+        data = response.json()
+        self.assertEqual(data['barangay_name'], 'Atlag')
+        self.assertIn('description', data)
+        self.assertIn('supervisor', data)
+
+
+class ScaleDataCommandTests(TestCase):
+    options = [
+        '--managers', '1', '--projects-per-manager', '2', '--subtasks-per-phase', '2',
+        '--workers-per-project', '3', '--workers-per-subtask', '2', '--days', '3',
+    ]
+
+    def generate(self, *extra):
+        call_command('generate_scale_data', *self.options, *extra, stdout=io.StringIO())
+
+    def test_generates_counts_and_clear_replaces_them(self):
+        self.generate()
+        start = datetime.date.today() - datetime.timedelta(days=3)
+        workdays = sum(1 for offset in range(3) if (start + datetime.timedelta(days=offset)).weekday() != 6)
+        self.assertEqual(models.Project.objects.count(), 2)
+        self.assertEqual(models.Phase.objects.count(), 2 * len(models.Phase.PHASE_CHOICES))
+        self.assertEqual(models.Subtask.objects.count(), 2 * 2 * len(models.Phase.PHASE_CHOICES))
+        self.assertEqual(models.SubtaskFieldWorker.objects.count(), 2 * models.Subtask.objects.count())
+        self.assertEqual(models.Attendance.objects.count(), 6 * workdays)
+        self.assertEqual(models.Project.objects.first().total_subtasks, 2 * len(models.Phase.PHASE_CHOICES))
+
+        self.generate('--clear')
+        self.assertEqual(models.User.objects.count(), 1)
+        self.assertEqual(models.Identity.objects.count(), 1)
+        self.assertEqual(models.Project.objects.count(), 2)
+        self.assertEqual(models.FieldWorker.objects.count(), 6)
+
+    def test_benchmark_writes_a_report(self):
+        self.generate()
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        output = f'{output_dir}/results.json'
+        endpoints = ['--only', 'projects by user', '--only', 'phases by project']
+        call_command('benchmark_api', '--iterations', '2', '--output', output, *endpoints, stdout=io.StringIO())
+
+        with open(output) as results:
+            report = json.load(results)
+        self.assertEqual(report['iterations'], 2)
+        self.assertEqual([entry['name'] for entry in report['endpoints']], ['projects by user', 'phases by project'])
+        for entry in report['endpoints']:
+            self.assertEqual(entry['status'], 200)
+            self.assertLessEqual(
+                {'url', 'p50_ms', 'p95_ms', 'mean_ms', 'queries', 'bytes'}, set(entry)
+            )
+
+        out = io.StringIO()
+        call_command(
+            'benchmark_api', '--iterations', '2', '--output', f'{output_dir}/again.json', '--baseline', output,
+            '--tolerance', '1000', *endpoints, stdout=out,
+        )
+        self.assertIn('No regressions', out.getvalue())
+
+    def test_benchmark_runs_on_projects_without_phases(self):
+        self.generate()
+        models.Phase.objects.all().delete()
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        call_command(
+            'benchmark_api', '--iterations', '1', '--output', f'{output_dir}/results.json',
+            '--only', 'phases by project', stdout=io.StringIO(),
+        )
+
+
+class LoadPsgcCommandTests(TestCase):
+    rows = [
+        ('level', 'code', 'name', 'parent_code'),
+        ('region', '03', 'Central Luzon', ''),
+        # Listed before its city; held back until the city is loaded
+        ('barangay', '031410001', 'Atlag', '031410'),
+        ('province', '0314', 'Bulacan', '03'),
+        ('city', '031410', 'Malolos', '0314'),
+        ('city', '031420', 'Meycauayan', '0314'),
+        ('barangay', '031410002', 'Bagna', '031410'),
+        ('barangay', '099999001', 'Nowhere', '099999'),
+    ]
+
+    def load(self, rows):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = f'{directory}/psgc.csv'
+        with open(path, 'w', newline='') as handle:
+            csv.writer(handle).writerows(rows)
+        out = io.StringIO()
+        call_command('load_psgc', path, '--batch-size', '2', stdout=out)
+        return out.getvalue()
+
+    def counts(self):
+        return [model.objects.count() for model in (models.Region, models.Province, models.City, models.Barangay)]
+
+    def test_loading_twice_upserts_without_duplicates(self):
+        output = self.load(self.rows)
+        self.assertEqual(self.counts(), [1, 1, 2, 2])
+        self.assertIn('Barangay: 2 upserted, 1 without a known parent', output)
+
+        renamed = [*self.rows[:-2], ('barangay', '031410002', 'Bagna Proper', '031410')]
+        self.load(renamed)
+        self.assertEqual(self.counts(), [1, 1, 2, 2])
+        self.assertEqual(models.Barangay.objects.get(code='031410002').name, 'Bagna Proper')
+        self.assertEqual(models.Barangay.objects.get(code='031410001').city.code, '031410')
+
+
+class AuditQueryPlansCommandTests(TestCase):
+
+    def test_hot_queries_use_the_composite_indexes(self):
+        project = make_project()
+        workers = make_workers(project, 2)
+        make_phases(project, 1, 1, workers)
+        models.Attendance.objects.create(
+            field_worker=workers[0], project=project, attendance_date=datetime.date(2025, 3, 3)
+        )
+        out = io.StringIO()
+        call_command('audit_query_plans', '--strict', '--verbose-plans', stdout=out)
+        output = out.getvalue()
+        for index in (
+            'project_user_created_idx',
+            'attendance_project_date_idx',
+            'phase_project_created_idx',
+            'subtask_phase_created_idx',
+        ):
+            self.assertIn(f'USING INDEX {index}', output)
+        self.assertNotIn('FLAGGED', output)
+        self.assertIn('0 flagged', output)
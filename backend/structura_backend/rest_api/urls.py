@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .dashboard import manager_dashboard, project_dashboard
 from .views import (
     ListUser, 
     DetailUser, 
@@ -17,8 +18,14 @@ from .views import (
     SubtaskViewSet,
     SubtaskFieldWorkerViewSet,
     AttendanceViewSet,
+    PayrollViewSet,
+    ReportViewSet,
+    address_tree,
+    upload_media,
+    media_file,
     debug_projects,
-    debug_all_data
+    debug_all_data,
+    debug_db_pool,
 )
 
 router = DefaultRouter()
@@ -34,12 +41,20 @@ router.register(r'phases', PhaseViewSet, basename='phase')
 router.register(r'subtasks', SubtaskViewSet, basename='subtask')
 router.register(r'subtask-assignments', SubtaskFieldWorkerViewSet, basename='subtask-assignment')
 router.register(r'attendance', AttendanceViewSet, basename='attendance')
+router.register(r'payroll', PayrollViewSet, basename='payroll')
+router.register(r'reports', ReportViewSet, basename='report')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('users/', ListUser.as_view()),
     path('users/<int:pk>/', DetailUser.as_view()),
     path('login/', login_user, name='login'),
+    path('address-tree/', address_tree, name='address_tree'),
+    path('media/', upload_media, name='upload_media'),
+    path('media/<str:key>/<str:variant>/', media_file, name='media_file'),
+    path('dashboard/', manager_dashboard, name='manager_dashboard'),
+    path('dashboard/projects/<int:project_id>/', project_dashboard, name='project_dashboard'),
     path('debug/projects/', debug_projects, name='debug_projects'),
     path('debug/all/', debug_all_data, name='debug_all_data'),
+    path('debug/db-pool/', debug_db_pool, name='debug_db_pool'),
 ]
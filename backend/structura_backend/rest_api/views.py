@@ -1,13 +1,23 @@
 from django.shortcuts import render
 from rest_framework import generics, status, viewsets
-from rest_framework.decorators import api_view
+from rest_framework.decorators import action, api_view, authentication_classes, parser_classes
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 from django.contrib.auth.hashers import check_password
+from django.db import IntegrityError, connection, transaction
+from django.http import FileResponse, Http404, HttpResponse
+from django.views.decorators.http import require_GET
 from django.views.decorators.csrf import csrf_exempt
+import csv
+import io
 import json
 
 # Create your views here.
 from app import models
+from . import address_bundle, crews, exports, media, payroll, reports, response_cache
+from .authentication import issue_token
+from .fieldsets import SparseQuerysetMixin
+from .response_cache import ProjectResponseCacheMixin
 from .serializers import (
     UserSerializer, 
     RegionSerializer, 
@@ -15,26 +25,39 @@ from .serializers import (
     CitySerializer, 
     BarangaySerializer,
     ProjectSerializer,
+    ProjectListSerializer,
+    ProjectTreeSerializer,
     SupervisorSerializer,
     SupervisorsSerializer,
     FieldWorkerSerializer,
+    FieldWorkerImportRowSerializer,
     ClientSerializer,
     PhaseSerializer,
     SubtaskSerializer,
     SubtaskFieldWorkerSerializer,
-    AttendanceSerializer
+    AttendanceSerializer,
+    AttendanceBulkRowSerializer,
+    ExportRequestSerializer,
+    WorkerReassignSerializer,
+    PayrollRequestSerializer,
+    PayrollEntrySerializer,
+    PayrollPeriodSerializer,
+    ReportRequestSerializer,
+    assigned_workers_prefetch,
 )
 
-class ListUser(generics.ListCreateAPIView):
+class ListUser(SparseQuerysetMixin, generics.ListCreateAPIView):
     queryset = models.User.objects.all()
     serializer_class = UserSerializer
+    pagination_ordering = ('user_id',)
 
-class DetailUser(generics.RetrieveUpdateDestroyAPIView):
+class DetailUser(SparseQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = models.User.objects.all()
     serializer_class = UserSerializer
 
 @csrf_exempt
 @api_view(['POST'])
+@authentication_classes([])
 def login_user(request):
     """
     Authenticate user with email and password.
@@ -51,87 +74,33 @@ def login_user(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # First, try to find user as a regular User (ProjectManager, etc.)
-        try:
-            user = models.User.objects.get(email=email)
-            # Check password
-            if check_password(password, user.password_hash):
-                return Response({
-                    'success': True,
-                    'message': 'Login successful',
-                    'user': {
-                        'user_id': user.user_id,
-                        'email': user.email,
-                        'first_name': user.first_name,
-                        'last_name': user.last_name,
-                        'role': user.role,
-                        'type': 'user',  # Indicate this is a regular user/project manager
-                    }
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response(
-                    {'success': False, 'message': 'Invalid password'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-        except models.User.DoesNotExist:
-            pass  # Not a User, check if it's a Worker or Client
-        
-        # If not a regular user, check if they're a Supervisor
-        try:
-            supervisor = models.Supervisors.objects.get(email=email)
-            # Check password
-            if check_password(password, supervisor.password_hash):
-                return Response({
-                    'success': True,
-                    'message': 'Login successful',
-                    'user': {
-                        'supervisor_id': supervisor.supervisor_id,
-                        'user_id': supervisor.supervisor_id,  # Use supervisor_id as user_id
-                        'project_id': supervisor.project_id.project_id if supervisor.project_id else None,
-                        'email': supervisor.email,
-                        'first_name': supervisor.first_name,
-                        'last_name': supervisor.last_name,
-                        'role': 'Supervisor',
-                        'type': 'Supervisor',  # Indicate this is a supervisor
-                    }
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response(
-                    {'success': False, 'message': 'Invalid password'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-        except models.Supervisors.DoesNotExist:
-            pass  # Not a Supervisor, check if it's a Client
-        
-        # If not a supervisor, check if they're a Client
-        try:
-            client = models.Client.objects.get(email=email)
-            # Check password
-            if check_password(password, client.password_hash):
-                return Response({
-                    'success': True,
-                    'message': 'Login successful',
-                    'user': {
-                        'client_id': client.client_id,
-                        'user_id': client.client_id,  # Use client_id as user_id
-                        'project_id': client.project_id.project_id if client.project_id else None,
-                        'email': client.email,
-                        'first_name': client.first_name,
-                        'last_name': client.last_name,
-                        'role': 'Client',
-                        'type': 'Client',  # Indicate this is a client
-                    }
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response(
-                    {'success': False, 'message': 'Invalid password'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-        except models.Client.DoesNotExist:
+        # One indexed lookup across User, Supervisors and Client
+        identity = models.Identity.objects.filter(email=email).order_by('precedence').first()
+        if identity is None:
             return Response(
                 {'success': False, 'message': 'Email not found in system'},
                 status=status.HTTP_404_NOT_FOUND
             )
+
+        if not check_password(password, identity.password_hash):
+            return Response(
+                {'success': False, 'message': 'Invalid password'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        payload = identity.login_payload
+        return Response({
+            'success': True,
+            'message': 'Login successful',
+            'token': issue_token(
+                identity.principal_type,
+                identity.principal_id,
+                payload['role'],
+                identity.email,
+                payload.get('project_id'),
+            ),
+            'user': payload,
+        }, status=status.HTTP_200_OK)
         
     except Exception as e:
         return Response(
@@ -141,13 +110,15 @@ def login_user(request):
 
 
 # Address Hierarchy ViewSets
-class RegionViewSet(viewsets.ReadOnlyModelViewSet):
+class RegionViewSet(SparseQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = models.Region.objects.all()
     serializer_class = RegionSerializer
+    pagination_ordering = ('id',)
 
 
-class ProvinceViewSet(viewsets.ReadOnlyModelViewSet):
+class ProvinceViewSet(SparseQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = ProvinceSerializer
+    pagination_ordering = ('id',)
 
     def get_queryset(self):
         queryset = models.Province.objects.all()
@@ -157,8 +128,9 @@ class ProvinceViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
-class CityViewSet(viewsets.ReadOnlyModelViewSet):
+class CityViewSet(SparseQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = CitySerializer
+    pagination_ordering = ('id',)
 
     def get_queryset(self):
         queryset = models.City.objects.all()
@@ -168,8 +140,9 @@ class CityViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
-class BarangayViewSet(viewsets.ReadOnlyModelViewSet):
+class BarangayViewSet(SparseQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = BarangaySerializer
+    pagination_ordering = ('id',)
 
     def get_queryset(self):
         queryset = models.Barangay.objects.all()
@@ -179,29 +152,142 @@ class BarangayViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
+@api_view(['POST'])
+@parser_classes([MultiPartParser, FormParser])
+def upload_media(request):
+    """
+    Store an image sent as multipart "file" and generate its thumbnails.
+    With "project", the project's project_image is set to the new media key.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response(
+            {'success': False, 'message': 'file is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    project = None
+    project_id = request.data.get('project')
+    if project_id:
+        project = models.Project.objects.filter(pk=project_id).first() if str(project_id).isdigit() else None
+        if project is None:
+            return Response(
+                {'success': False, 'message': 'Project not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+    try:
+        asset = media.store_upload(upload, project)
+    except media.InvalidUpload as exc:
+        return Response(
+            {'success': False, 'message': str(exc)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if project is not None:
+        project.project_image = asset.key
+        project.save(update_fields=['project_image'])
+    return Response(media.asset_payload(asset), status=status.HTTP_201_CREATED)
+
+
+@require_GET
+def media_file(request, key, variant):
+    """
+    Serve an original or thumbnail. Content under a key never changes, so it
+    is cacheable forever and revalidation is answered without a query.
+    """
+    if not media.KEY_PATTERN.match(key):
+        raise Http404('Unknown media key')
+    if variant != 'original' and variant not in media.THUMBNAIL_SIZES:
+        raise Http404('Unknown variant')
+    etag = media.etag_for(key, variant)
+    if etag in [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        asset = models.MediaAsset.objects.filter(key=key).first()
+        if asset is None:
+            raise Http404('Unknown media key')
+        name, content_type = media.open_variant(asset, variant)
+        try:
+            handle = media.storage().open(name, 'rb')
+        except OSError:
+            raise Http404('Media file is missing')
+        response = FileResponse(handle, content_type=content_type)
+    response['ETag'] = etag
+    response['Cache-Control'] = media.IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+@api_view(['GET'])
+def address_tree(request):
+    """
+    Whole Region/Province/City/Barangay hierarchy, or one region's subtree
+    with ?region=<id>. Served from a prebuilt in-memory document with a
+    strong ETag, so revalidation costs a 304 and no queries.
+    """
+    region_id = request.query_params.get('region')
+    if region_id is not None:
+        try:
+            region_id = int(region_id)
+        except ValueError:
+            return Response(
+                {'success': False, 'message': 'region must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    bundle = address_bundle.get_bundle(region_id)
+    if bundle is None:
+        return Response(
+            {'success': False, 'message': 'Region not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    use_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    etag = bundle.gzip_etag if use_gzip else bundle.etag
+    if_none_match = [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]
+
+    if bundle.etag in if_none_match or bundle.gzip_etag in if_none_match:
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    elif use_gzip:
+        response = HttpResponse(bundle.gzip_body, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(bundle.body, content_type='application/json')
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=86400'
+    response['Vary'] = 'Accept-Encoding'
+    return response
+
+
 # Project ViewSet
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ProjectResponseCacheMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = ProjectSerializer
+    pagination_ordering = ('-created_at', '-project_id')
+    cached_actions = ('retrieve', 'tree')
+
+    def cache_project_id(self):
+        pk = self.kwargs.get('pk')
+        return int(pk) if pk and pk.isdigit() else None
     
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ProjectListSerializer
+        return ProjectSerializer
+
     def get_queryset(self):
         """
         Get projects only for the logged-in user
         SELECT * FROM projects WHERE user_id = user_id
+        Region, province, city and barangay names are joined in by
+        SparseQuerysetMixin, so a listing is a single query.
         """
         # For now, get user_id from request headers or query params
         # In production, use authentication tokens
         user_id = self.request.query_params.get('user_id')
         
-        print(f"🔍 ProjectViewSet get_queryset called")
-        print(f"🔍 Received user_id: {user_id}")
-        
         if user_id:
-            queryset = models.Project.objects.filter(user_id=user_id).order_by('-created_at')
-            print(f"✅ Filtered projects count: {queryset.count()}")
-            return queryset
+            return models.Project.objects.filter(user_id=user_id).order_by('-created_at')
         
         # If no user_id provided, return all projects (for individual project retrieval)
-        print(f"⚠️ No user_id provided, returning all projects")
         return models.Project.objects.all()
     
     def perform_create(self, serializer):
@@ -209,12 +295,32 @@ class ProjectViewSet(viewsets.ModelViewSet):
         Automatically set the user_id when creating a project
         """
         user_id = self.request.data.get('user_id') or self.request.query_params.get('user_id')
-        print(f"🔍 perform_create called with user_id: {user_id}")
         if user_id:
             serializer.save(user_id=user_id)
         else:
             raise ValueError("user_id is required to create a project")
 
+    @action(detail=True, methods=['get'])
+    def tree(self, request, pk=None):
+        """
+        Project, phases, subtasks, assigned workers and roll-up counts in one
+        response. Runs a fixed number of queries regardless of project size.
+        """
+        queryset = models.Project.objects.select_related(
+            'region', 'province', 'city', 'barangay'
+        ).prefetch_related(
+            'phases__subtasks',
+            assigned_workers_prefetch('phases__subtasks__assigned_workers'),
+            'field_workers',
+        )
+
+        def build():
+            project = generics.get_object_or_404(queryset, pk=pk)
+            serializer = ProjectTreeSerializer(project, context=self.get_serializer_context())
+            return Response(serializer.data)
+
+        return self.dispatch_cached(lambda request: build(), request)
+
 
 @csrf_exempt
 @api_view(['GET'])
@@ -245,22 +351,43 @@ def debug_all_data(request):
     })
 
 
+@csrf_exempt
+@api_view(['GET'])
+def debug_db_pool(request):
+    """
+    Debug endpoint showing how database connections are reused and, when
+    DB_POOL is enabled, the psycopg pool statistics
+    """
+    pool = getattr(connection, 'pool', None)
+    return Response({
+        'vendor': connection.vendor,
+        'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+        'conn_health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+        'pooled': pool is not None,
+        'pool': pool.get_stats() if pool is not None else None,
+    })
+
+
 # Supervisors ViewSet
-class SupervisorsViewSet(viewsets.ModelViewSet):
+class SupervisorsViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = models.Supervisors.objects.all()
     serializer_class = SupervisorsSerializer
+    pagination_ordering = ('supervisor_id',)
 
 
 # Supervisor ViewSet (alias for backwards compatibility)
-class SupervisorViewSet(viewsets.ModelViewSet):
+class SupervisorViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = models.Supervisors.objects.all()
     serializer_class = SupervisorSerializer
+    pagination_ordering = ('supervisor_id',)
 
 
 # FieldWorker ViewSet
-class FieldWorkerViewSet(viewsets.ModelViewSet):
+class FieldWorkerViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = models.FieldWorker.objects.all()
     serializer_class = FieldWorkerSerializer
+    pagination_ordering = ('fieldworker_id',)
+    max_import_rows = 5000
 
     def get_queryset(self):
         queryset = models.FieldWorker.objects.all()
@@ -269,19 +396,175 @@ class FieldWorkerViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(project_id=project_id)
         return queryset
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the roster of ?project_id= as CSV."""
+        params = ExportRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        project = params.validated_data['project_id']
+        queryset = models.FieldWorker.objects.filter(project_id=project).order_by(
+            'last_name', 'first_name', 'fieldworker_id'
+        )
+        return exports.csv_response(
+            f'field-workers-project-{project.project_id}.csv', exports.FIELD_WORKER_COLUMNS, queryset
+        )
+
+    @action(detail=False, methods=['post'])
+    def reassign(self, request):
+        """
+        Move a crew to another project: {"from_project", "to_project",
+        "field_workers": [ids], "role"}. Without field_workers or role every
+        worker on from_project moves. Their assignments to subtasks outside
+        to_project are removed in the same transaction.
+        """
+        params = WorkerReassignSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        workers = crews.crew_queryset(
+            data['from_project'].project_id, data.get('field_workers'), data.get('role')
+        )
+        result = crews.move_workers(workers, data['to_project'].project_id)
+        return Response({
+            'success': True,
+            'from_project': data['from_project'].project_id,
+            'to_project': data['to_project'].project_id,
+            **result,
+        })
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_workers(self, request):
+        """
+        Onboard a crew in one request. Send ?project_id= (or "project_id" in the
+        body) with either a CSV upload in "file" (header row with the
+        FieldWorker column names) or JSON rows as "workers" or a bare array.
+        Rows are validated together and rejected when an SSS, PhilHealth or
+        Pag-IBIG ID is already on file or repeated in the upload; the rest are
+        inserted in one transaction. "dry_run": true only validates.
+        """
+        body = request.data if isinstance(request.data, dict) else {}
+        project_id = request.query_params.get('project_id') or body.get('project_id')
+        try:
+            project = models.Project.objects.get(pk=int(project_id))
+        except (TypeError, ValueError):
+            return Response(
+                {'success': False, 'message': 'project_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except models.Project.DoesNotExist:
+            return Response(
+                {'success': False, 'message': 'Project not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        upload = request.FILES.get('file')
+        if upload is not None:
+            try:
+                records = list(csv.DictReader(io.StringIO(upload.read().decode('utf-8-sig'))))
+            except UnicodeDecodeError:
+                return Response(
+                    {'success': False, 'message': 'file must be UTF-8 encoded CSV'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        elif isinstance(request.data, list):
+            records = request.data
+        else:
+            records = body.get('workers')
+        if not isinstance(records, list):
+            return Response(
+                {'success': False, 'message': 'Send a CSV file or a list of workers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(records) > self.max_import_rows:
+            return Response(
+                {'success': False, 'message': f'At most {self.max_import_rows} workers per import'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = [None] * len(records)
+        valid = {}
+        for index, record in enumerate(records):
+            row = FieldWorkerImportRowSerializer(data=record)
+            if row.is_valid():
+                valid[index] = row.validated_data
+            else:
+                results[index] = {'index': index, 'status': 'error', 'errors': row.errors}
+
+        id_fields = FieldWorkerImportRowSerializer.GOVERNMENT_ID_FIELDS
+        submitted = {field: set() for field in id_fields}
+        for data in valid.values():
+            for field in id_fields:
+                if data.get(field):
+                    submitted[field].add(data[field])
+        on_file = {
+            field: set(
+                models.FieldWorker.objects.filter(**{f'{field}__in': values}).values_list(field, flat=True)
+            ) if values else set()
+            for field, values in submitted.items()
+        }
+
+        seen = {field: set() for field in id_fields}
+        to_create = []
+        for index, data in valid.items():
+            errors = {}
+            for field in id_fields:
+                value = data.get(field)
+                if not value:
+                    continue
+                if value in on_file[field]:
+                    errors[field] = ['A field worker with this ID already exists']
+                elif value in seen[field]:
+                    errors[field] = ['Duplicate ID in this import']
+            if errors:
+                results[index] = {'index': index, 'status': 'error', 'errors': errors}
+                continue
+            for field in id_fields:
+                if data.get(field):
+                    seen[field].add(data[field])
+            to_create.append((index, models.FieldWorker(project_id=project, **data)))
+
+        dry_run = str(body.get('dry_run', request.query_params.get('dry_run', ''))).lower() in ('1', 'true')
+        if to_create and not dry_run:
+            with transaction.atomic():
+                models.FieldWorker.objects.bulk_create([worker for _, worker in to_create])
+                # bulk_create sends no post_save
+                transaction.on_commit(lambda: response_cache.invalidate(project.project_id))
+
+        for index, worker in to_create:
+            results[index] = {
+                'index': index,
+                'status': 'valid' if dry_run else 'created',
+                'fieldworker_id': worker.fieldworker_id,
+            }
+
+        return Response({
+            'success': True,
+            'dry_run': dry_run,
+            'created': 0 if dry_run else len(to_create),
+            'failed': sum(1 for result in results if result['status'] == 'error'),
+            'results': results,
+        }, status=status.HTTP_200_OK)
+
 
 # Client ViewSet
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = models.Client.objects.all()
     serializer_class = ClientSerializer
+    pagination_ordering = ('client_id',)
 
 
 # Phase ViewSet
-class PhaseViewSet(viewsets.ModelViewSet):
+class PhaseViewSet(ProjectResponseCacheMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = models.Phase.objects.all()
     serializer_class = PhaseSerializer
+    pagination_ordering = ('created_at', 'phase_id')
+    cached_actions = ('list',)
+
+    def cache_project_id(self):
+        project_id = self.request.query_params.get('project_id')
+        return int(project_id) if project_id and project_id.isdigit() else None
 
     def get_queryset(self):
+        # Relations the requested fields need are added by SparseQuerysetMixin
         queryset = models.Phase.objects.all()
         project_id = self.request.query_params.get('project_id')
         if project_id:
@@ -290,9 +573,10 @@ class PhaseViewSet(viewsets.ModelViewSet):
 
 
 # Subtask ViewSet
-class SubtaskViewSet(viewsets.ModelViewSet):
+class SubtaskViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = models.Subtask.objects.all()
     serializer_class = SubtaskSerializer
+    pagination_ordering = ('created_at', 'subtask_id')
 
     def get_queryset(self):
         queryset = models.Subtask.objects.all()
@@ -303,9 +587,10 @@ class SubtaskViewSet(viewsets.ModelViewSet):
 
 
 # SubtaskFieldWorker ViewSet
-class SubtaskFieldWorkerViewSet(viewsets.ModelViewSet):
+class SubtaskFieldWorkerViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = models.SubtaskFieldWorker.objects.all()
     serializer_class = SubtaskFieldWorkerSerializer
+    pagination_ordering = ('assigned_at', 'assignment_id')
 
     def get_queryset(self):
         queryset = models.SubtaskFieldWorker.objects.all()
@@ -338,9 +623,11 @@ class SubtaskFieldWorkerViewSet(viewsets.ModelViewSet):
 
 
 # Attendance ViewSet
-class AttendanceViewSet(viewsets.ModelViewSet):
+class AttendanceViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = models.Attendance.objects.all()
     serializer_class = AttendanceSerializer
+    pagination_ordering = ('-attendance_date', '-attendance_id')
+    bulk_fields = ('check_in_time', 'check_out_time', 'break_in_time', 'break_out_time', 'status')
 
     def get_queryset(self):
         queryset = models.Attendance.objects.all()
@@ -355,4 +642,245 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         if field_worker_id:
             queryset = queryset.filter(field_worker_id=field_worker_id)
         
-        return queryset.order_by('-attendance_date')
\ No newline at end of file
+        return queryset.order_by('-attendance_date')
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream attendance for ?project_id=[&start_date=&end_date=] as CSV, oldest first."""
+        params = ExportRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        project = params.validated_data['project_id']
+        start_date = params.validated_data.get('start_date')
+        end_date = params.validated_data.get('end_date')
+
+        queryset = models.Attendance.objects.filter(project=project)
+        if start_date:
+            queryset = queryset.filter(attendance_date__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(attendance_date__lte=end_date)
+        queryset = queryset.order_by('attendance_date', 'attendance_id')
+
+        filename = f"attendance-project-{project.project_id}"
+        if start_date or end_date:
+            filename += f"-{start_date or 'start'}-to-{end_date or 'today'}"
+        return exports.csv_response(f'{filename}.csv', exports.ATTENDANCE_COLUMNS, queryset)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Insert-or-update attendance for a whole crew in one statement.
+        Body: {"project": <id>, "records": [{"field_worker", "attendance_date",
+        "check_in_time", ...}, ...]}. Each row only overwrites the fields it
+        sends, so re-submitting a roll call is harmless.
+        """
+        project_id = request.data.get('project')
+        records = request.data.get('records')
+        if not isinstance(records, list):
+            return Response(
+                {'success': False, 'message': 'records must be a list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            project_id = int(project_id)
+        except (TypeError, ValueError):
+            return Response(
+                {'success': False, 'message': 'project is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not models.Project.objects.filter(pk=project_id).exists():
+            return Response(
+                {'success': False, 'message': 'Project not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        results = [None] * len(records)
+        pending = {}
+        for index, record in enumerate(records):
+            row = AttendanceBulkRowSerializer(data=record)
+            if not row.is_valid():
+                results[index] = {'index': index, 'status': 'error', 'errors': row.errors}
+                continue
+            key = (row.validated_data['field_worker'], row.validated_data['attendance_date'])
+            if key in pending:
+                results[index] = {
+                    'index': index,
+                    'status': 'error',
+                    'errors': {'non_field_errors': ['Duplicate row for this worker and date']},
+                }
+                continue
+            pending[key] = (index, row.validated_data)
+
+        project_workers = set(
+            models.FieldWorker.objects.filter(
+                pk__in={worker_id for worker_id, _ in pending},
+                project_id=project_id,
+            ).values_list('pk', flat=True)
+        )
+        for key in [key for key in pending if key[0] not in project_workers]:
+            index, _ = pending.pop(key)
+            results[index] = {
+                'index': index,
+                'status': 'error',
+                'errors': {'field_worker': ['Field worker is not assigned to this project']},
+            }
+
+        with transaction.atomic():
+            existing = {
+                (attendance.field_worker_id, attendance.attendance_date): attendance
+                for attendance in models.Attendance.objects.select_for_update().filter(
+                    field_worker_id__in={worker_id for worker_id, _ in pending},
+                    attendance_date__in={attendance_date for _, attendance_date in pending},
+                )
+            }
+            rows = []
+            for (worker_id, attendance_date), (index, data) in pending.items():
+                current = existing.get((worker_id, attendance_date))
+                attendance = models.Attendance(
+                    field_worker_id=worker_id,
+                    project_id=project_id,
+                    attendance_date=attendance_date,
+                )
+                for field in self.bulk_fields:
+                    if field in data:
+                        setattr(attendance, field, data[field])
+                    elif current is not None:
+                        setattr(attendance, field, getattr(current, field))
+                attendance.set_durations()
+                rows.append((index, attendance, current))
+
+            models.Attendance.objects.bulk_create(
+                [attendance for _, attendance, _ in rows],
+                update_conflicts=True,
+                unique_fields=['field_worker', 'attendance_date'],
+                update_fields=['project', *self.bulk_fields, *models.Attendance.DURATION_FIELDS, 'updated_at'],
+            )
+            # bulk_create sends no post_save
+            transaction.on_commit(lambda: response_cache.invalidate(project_id))
+
+        for index, attendance, current in rows:
+            results[index] = {
+                'index': index,
+                'status': 'created' if current is None else 'updated',
+                'attendance_id': attendance.attendance_id or (current and current.attendance_id),
+                'field_worker': attendance.field_worker_id,
+                'attendance_date': attendance.attendance_date,
+            }
+
+        return Response({
+            'success': True,
+            'created': sum(1 for result in results if result['status'] == 'created'),
+            'updated': sum(1 for result in results if result['status'] == 'updated'),
+            'failed': sum(1 for result in results if result['status'] == 'error'),
+            'results': results,
+        }, status=status.HTTP_200_OK)
+
+
+# Payroll ViewSet
+class PayrollViewSet(viewsets.ViewSet):
+    """
+    GET  /api/payroll/?project=&start_date=&end_date=  hours and pay per worker
+    POST /api/payroll/finalize/                         store the period as a snapshot
+    GET  /api/payroll/periods/?project=                 finalized periods
+
+    A period that has been finalized is always served from its snapshot.
+    """
+
+    def list(self, request):
+        params = PayrollRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        project = params.validated_data['project']
+        start_date = params.validated_data['start_date']
+        end_date = params.validated_data['end_date']
+
+        period = models.PayrollPeriod.objects.prefetch_related('entries').filter(
+            project=project, start_date=start_date, end_date=end_date
+        ).first()
+        if period is not None:
+            return Response(PayrollPeriodSerializer(period).data)
+
+        result = payroll.compute_payroll(project.project_id, start_date, end_date)
+        result['entries'] = PayrollEntrySerializer(result['entries'], many=True).data
+        return Response(result)
+
+    @action(detail=False, methods=['post'])
+    def finalize(self, request):
+        params = PayrollRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        project = params.validated_data['project']
+        start_date = params.validated_data['start_date']
+        end_date = params.validated_data['end_date']
+
+        already_finalized = Response(
+            {'success': False, 'message': 'This pay period is already finalized'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+        if models.PayrollPeriod.objects.filter(
+            project=project, start_date=start_date, end_date=end_date
+        ).exists():
+            return already_finalized
+
+        try:
+            period = payroll.finalize_payroll(project.project_id, start_date, end_date)
+        except IntegrityError:
+            # A concurrent finalize of the same period won the unique constraint
+            return already_finalized
+        period = models.PayrollPeriod.objects.prefetch_related('entries').get(pk=period.pk)
+        return Response(PayrollPeriodSerializer(period).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'])
+    def periods(self, request):
+        queryset = models.PayrollPeriod.objects.prefetch_related('entries')
+        project_id = request.query_params.get('project')
+        if project_id:
+            queryset = queryset.filter(project_id=project_id)
+        return Response(PayrollPeriodSerializer(queryset, many=True).data)
+
+
+# Reports ViewSet
+class ReportViewSet(viewsets.ViewSet):
+    """
+    GET /api/reports/?project=[&start_date=&end_date=]  every report below
+    GET /api/reports/attendance/                        per-day attendance rate and hours
+    GET /api/reports/workforce/                         headcount and rates by role
+    GET /api/reports/progress/                          phase and subtask completion
+    GET /api/reports/budget/                            budget against accrued labor cost
+
+    The date range defaults to the 30 days ending today. Results are cached
+    per project and range until the project's data changes.
+    """
+
+    def report(self, request, names):
+        params = ReportRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        project_id = params.validated_data['project'].project_id
+        start_date = params.validated_data['start_date']
+        end_date = params.validated_data['end_date']
+        data = {
+            name: reports.cached_report(name, project_id, start_date, end_date)
+            for name in names
+        }
+        return Response({
+            'project': project_id,
+            'start_date': start_date,
+            'end_date': end_date,
+            **data,
+        })
+
+    def list(self, request):
+        return self.report(request, reports.REPORTS)
+
+    @action(detail=False, methods=['get'])
+    def attendance(self, request):
+        return self.report(request, ['attendance'])
+
+    @action(detail=False, methods=['get'])
+    def workforce(self, request):
+        return self.report(request, ['workforce'])
+
+    @action(detail=False, methods=['get'])
+    def progress(self, request):
+        return self.report(request, ['progress'])
+
+    @action(detail=False, methods=['get'])
+    def budget(self, request):
+        return self.report(request, ['budget'])
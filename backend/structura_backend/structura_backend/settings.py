@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'rest_api.middleware.RequestLoggingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -80,21 +84,62 @@ WSGI_APPLICATION = 'structura_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "HOST": "db.prokngxytawscbszbnxc.supabase.co",
-        "PORT": "5432",
-        "USER": "postgres",
-        "PASSWORD": "$Zamboanga_123",
-        "NAME": "postgres",
-        "OPTIONS": {
-            "sslmode": "require",
-        },
+# Connection settings come from the environment and default to the Supabase
+# instance; DB_PASSWORD has no default and must be set. Connections are kept
+# open between requests (DB_CONN_MAX_AGE) and health-checked before reuse;
+# DB_POOL=1 switches to a psycopg 3 connection pool (pip install
+# "psycopg[binary,pool]"). DB_ENGINE=sqlite uses the local db.sqlite3 file
+# for development.
+
+def env_flag(name, default=False):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_required(name):
+    value = os.environ.get(name)
+    if not value:
+        raise ImproperlyConfigured(f"Set the {name} environment variable.")
+    return value
+
+
+if os.environ.get('DB_ENGINE', 'postgresql') == 'sqlite':
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("DB_NAME", BASE_DIR / "db.sqlite3"),
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "HOST": os.environ.get("DB_HOST", "db.prokngxytawscbszbnxc.supabase.co"),
+            "PORT": os.environ.get("DB_PORT", "5432"),
+            "USER": os.environ.get("DB_USER", "postgres"),
+            "PASSWORD": env_required("DB_PASSWORD"),
+            "NAME": os.environ.get("DB_NAME", "postgres"),
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "600")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "sslmode": os.environ.get("DB_SSLMODE", "require"),
+                "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", "10")),
+            },
+        }
     }
-}
 
+    if env_flag("DB_POOL"):
+        from psycopg_pool import ConnectionPool
 
+        # Django manages pooled connections itself and requires CONN_MAX_AGE = 0
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "300")),
+            # Verify each connection when it is checked out of the pool
+            "check": ConnectionPool.check_connection,
+        }
 
 
 # Password validation
@@ -116,11 +161,67 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_api.authentication.SignedTokenAuthentication',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
-    ]
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'rest_api.pagination.KeysetPagination',
+}
+
+
+# Structured request logs, written off the request thread. LOG_HANDLER=null
+# discards them, e.g. for quiet test runs (assertLogs still captures them).
+REQUEST_LOG_HANDLERS = {
+    'queue': {'class': 'rest_api.request_logging.QueueListenerHandler'},
+    'null': {'class': 'logging.NullHandler'},
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'request_log': REQUEST_LOG_HANDLERS[os.environ.get('LOG_HANDLER', 'queue')],
+    },
+    'loggers': {
+        'rest_api.requests': {
+            'handlers': ['request_log'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
+# Signed API tokens issued by /api/login/
+AUTH_TOKEN_MAX_AGE = 60 * 60 * 24 * 7
+AUTH_TOKEN_CACHE_SIZE = 4096
+
+# Shared by the address bundle, reports and per-project response caches.
+# Local memory is per process; CACHE_BACKEND=file shares one cache between
+# the worker processes on a host (CACHE_LOCATION is the directory).
+if os.environ.get("CACHE_BACKEND") == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get("CACHE_LOCATION", str(BASE_DIR / "cache")),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("CACHE_MAX_ENTRIES", "5000"))},
+        }
+    }
+
+# /api/reports/ results; invalidated early whenever a project's rows change
+REPORTS_CACHE_TIMEOUT = 15 * 60
+
+# Per-project responses (rest_api.response_cache): fresh for RESPONSE_CACHE_TIMEOUT,
+# then served stale for up to RESPONSE_CACHE_STALE_TIMEOUT while one request rebuilds
+RESPONSE_CACHE_TIMEOUT = 5 * 60
+RESPONSE_CACHE_STALE_TIMEOUT = 60
 
 
 # Internationalization
@@ -140,6 +241,22 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded media (see rest_api.media). Originals and thumbnails go to the
+# "default" storage; point MEDIA_STORAGE_BACKEND at any Django storage class
+# (e.g. an S3 backend) to move them off the local disk.
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", str(BASE_DIR / "media"))
+MEDIA_URL = '/media/'
+MEDIA_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+STORAGES = {
+    "default": {
+        "BACKEND": os.environ.get("MEDIA_STORAGE_BACKEND", "django.core.files.storage.FileSystemStorage"),
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 